@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+JSON Decoder Benchmark
+Description: Compares the available JSON decoder backends on generated order files.
+
+Usage:
+    python examples/benchmark_json_decoders.py --count 5000 --repeat 5
+"""
+
+# Imports
+# Standard library
+import argparse  # for command-line arguments
+import json  # for building the raw payload
+import logging  # for logging results
+import timeit  # for timing decoders
+
+# External libraries
+from faker import Faker  # for realistic names, addresses, emails
+from src import generate_order
+from lambda_function.decoder import BACKENDS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+
+if __name__ == "__main__":
+    # Command-line arguments
+    parser = argparse.ArgumentParser(description="Benchmark JSON decoder backends")
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=5000,
+        help="Number of orders in the generated payload",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed decodes per backend (best is reported)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Seed for reproducible fake data",
+    )
+    args = parser.parse_args()
+
+    # Build one raw payload shared by all backends
+    fake = Faker()
+    fake.seed_instance(args.seed)
+    raw = json.dumps([generate_order(fake) for _ in range(args.count)], indent=2)
+    logging.info(f"Generated {args.count} orders ({len(raw) / 1e6:.2f} MB)")
+
+    # Time each installed backend
+    results = {}
+    for name, loads in BACKENDS.items():
+        timings = timeit.repeat(lambda: loads(raw), number=1, repeat=args.repeat)
+        results[name] = min(timings)
+
+    baseline = results["json"]
+    for name, best in sorted(results.items(), key=lambda kv: kv[1]):
+        logging.info(
+            f"{name:>8}: {best * 1000:8.2f} ms  "
+            f"({len(raw) / best / 1e6:7.1f} MB/s, {baseline / best:4.1f}x vs json)"
+        )
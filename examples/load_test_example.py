@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+"""
+Local Load Test
+Description: Drives index.handler end to end against an in-process fake S3
+and reports latency percentiles, throughput and error rates.
+
+Usage:
+    python examples/load_test_example.py --requests 200 --rate 20 --concurrency 8
+"""
+
+# Imports
+# Standard library
+import argparse  # for command-line arguments
+import json  # for printing the report
+import logging  # for logging events
+
+# External libraries
+from faker import Faker  # for realistic names, addresses, emails
+from src.fake_s3 import FakeS3Client
+from lambda_function import config
+from src.load_driver import seed_input_files, run_load_test
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+
+# The handler logs every step on the root logger; keep the report readable
+logging.getLogger().setLevel(logging.WARNING)
+log = logging.getLogger("load_test")
+log.setLevel(logging.INFO)
+
+if __name__ == "__main__":
+    # Command-line arguments
+    parser = argparse.ArgumentParser(description="Local end-to-end load test")
+    parser.add_argument(
+        "--requests", type=int, default=100, help="Total handler invocations"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Target invocations per second (default: as fast as possible)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Maximum concurrent invocations"
+    )
+    parser.add_argument(
+        "--records-per-event",
+        type=int,
+        default=1,
+        help="S3 records per event (values above 1 need PIPELINE_MODE=true)",
+    )
+    parser.add_argument(
+        "--files", type=int, default=10, help="Number of input files to generate"
+    )
+    parser.add_argument(
+        "--orders-per-file", type=int, default=100, help="Orders in each input file"
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=20.0,
+        help="Simulated S3 latency per request in milliseconds",
+    )
+    parser.add_argument(
+        "--bandwidth-mb-per-s",
+        type=float,
+        default=None,
+        help="Simulated S3 bandwidth in MB/s (default: unlimited)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for reproducible fake data (optional)",
+    )
+    args = parser.parse_args()
+
+    if args.records_per_event > 1 and not config.PIPELINE_MODE:
+        parser.error("--records-per-event > 1 requires PIPELINE_MODE=true")
+
+    # Initialize Faker
+    fake = Faker()
+    if args.seed is not None:
+        fake.seed_instance(args.seed)
+
+    # Seed the fake S3 with generated order files
+    bandwidth = args.bandwidth_mb_per_s * 1e6 if args.bandwidth_mb_per_s else None
+    client = FakeS3Client(latency=args.latency_ms / 1000, bandwidth=bandwidth)
+    keys = seed_input_files(
+        client, "input-bucket", args.files, args.orders_per_file, fake=fake
+    )
+    log.info(f"Seeded {len(keys)} input files ({args.orders_per_file} orders each)")
+
+    # Fire events and report
+    report = run_load_test(
+        client,
+        "input-bucket",
+        keys,
+        num_requests=args.requests,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        records_per_event=args.records_per_event,
+    )
+    log.info(json.dumps(report, indent=2))
@@ -15,3 +15,49 @@ PROCESSED_PREFIX = os.getenv("PROCESSED_PREFIX", "processed/")
 
 # Logging level (INFO, DEBUG, WARNING)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# JSON decoder backend for raw input (auto, orjson, json)
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+# Emit products.csv and reference it from items.csv by surrogate id
+PRODUCT_DIMENSION = os.getenv("PRODUCT_DIMENSION", "false").lower() == "true"
+
+# Filename of the per-run statistics manifest written next to the CSVs
+MANIFEST_FILENAME = os.getenv("MANIFEST_FILENAME", "manifest.json")
+
+# Pipelined execution: stream each object so its S3 read, transform and
+# uploads overlap (and run several records of one event at once)
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "false").lower() == "true"
+
+# Bounded queue size between pipeline stages (backpressure, at least 1)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+# Concurrent S3 readers and writers in pipelined mode (each at least 1)
+PIPELINE_READ_WORKERS = int(os.getenv("PIPELINE_READ_WORKERS", "2"))
+PIPELINE_WRITE_WORKERS = int(os.getenv("PIPELINE_WRITE_WORKERS", "4"))
+
+# Bytes read from S3 per chunk in pipelined mode (at least 1)
+PIPELINE_CHUNK_BYTES = int(os.getenv("PIPELINE_CHUNK_BYTES", str(1024 * 1024)))
+
+# Fan out inputs larger than this many bytes across shard workers (0 disables)
+FANOUT_THRESHOLD_BYTES = int(os.getenv("FANOUT_THRESHOLD_BYTES", "0"))
+
+# Target shard size and cap on shards in flight for fan-out
+# (0 runs every shard at once, bounded by the function's concurrency)
+FANOUT_SHARD_BYTES = int(os.getenv("FANOUT_SHARD_BYTES", str(64 * 1024 * 1024)))
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "0"))
+
+# Function invoked once per shard (defaults to this function itself)
+FANOUT_WORKER_FUNCTION = os.getenv(
+    "FANOUT_WORKER_FUNCTION", os.getenv("AWS_LAMBDA_FUNCTION_NAME", "")
+)
+
+# How long the coordinator waits on one shard worker invocation (seconds)
+FANOUT_WORKER_TIMEOUT_SECONDS = int(os.getenv("FANOUT_WORKER_TIMEOUT_SECONDS", "900"))
+
+# Filename of the shard completion manifest under _shards/<bucket>/<key>/
+SHARD_MANIFEST_FILENAME = os.getenv("SHARD_MANIFEST_FILENAME", "_shards.json")
+
+# Part size for streamed multipart uploads, in pipelined mode and the
+# fan-out merge (S3 requires at least 5 MB)
+MULTIPART_PART_BYTES = int(os.getenv("MULTIPART_PART_BYTES", str(8 * 1024 * 1024)))
@@ -0,0 +1,249 @@
+"""
+decoder.py
+
+Pluggable JSON decoder backends for the automated serverless pipeline.
+Uses a faster optional backend (orjson) when it is installed and falls
+back to the standard library otherwise.
+
+orjson is stricter than the standard library: it rejects NaN/Infinity and
+integers wider than 64 bits. So that installing orjson never changes which
+inputs are accepted, documents orjson rejects are retried with the
+standard library before a TransformError is raised.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from .errors import ConfigurationError, SchemaValidationError, TransformError
+from . import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _stdlib_loads(raw: str) -> Any:
+    return json.loads(raw)
+
+
+def _orjson_loads(raw: str) -> Any:
+    return orjson.loads(raw)
+
+
+# Incremental decoding of array elements (see RecordStream)
+_raw_decode = json.JSONDecoder().raw_decode
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = frozenset("0123456789.eE+-")
+
+# Registered backends, in order of preference for "auto"
+BACKENDS: Dict[str, Callable[[str], Any]] = {}
+if orjson is not None:
+    BACKENDS["orjson"] = _orjson_loads
+BACKENDS["json"] = _stdlib_loads
+
+
+def get_decoder(name: Optional[str] = None) -> Callable[[str], Any]:
+    """
+    Return the decode function for the requested backend.
+    name: 'auto', 'orjson' or 'json' (defaults to config.JSON_BACKEND).
+    'auto' picks the fastest installed backend.
+    Raises ConfigurationError for an unknown or uninstalled backend.
+    """
+    name = (name or config.JSON_BACKEND).lower()
+
+    if name == "auto":
+        return next(iter(BACKENDS.values()))
+
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ConfigurationError(
+            f"JSON backend '{name}' is not available "
+            f"(installed: {', '.join(BACKENDS)})"
+        )
+
+
+def decode_json(raw: str, backend: Optional[str] = None) -> Any:
+    """
+    Decode a JSON document with the selected backend.
+    Raises TransformError on invalid input, whichever backend is used.
+    """
+    decoder = get_decoder(backend)
+
+    try:
+        return decoder(raw)
+    except (ValueError, TypeError) as e:
+        # json.JSONDecodeError and orjson.JSONDecodeError are both ValueErrors
+        if decoder is _stdlib_loads:
+            raise TransformError(f"Invalid JSON input: {e}")
+
+    # orjson rejected it; accept anything the standard library accepts
+    try:
+        return _stdlib_loads(raw)
+    except (ValueError, TypeError) as e:
+        raise TransformError(f"Invalid JSON input: {e}")
+
+
+def decode_records(raw: str, backend: Optional[str] = None) -> Any:
+    """
+    Decode a JSON document (normally an array of records) or JSON Lines
+    (one object per line). Input starting with '{' that is not a single
+    JSON document is read as JSON Lines; a lone object is returned as-is,
+    so callers still reject it as not being a list of records.
+    Raises TransformError on invalid input, naming the line for JSON Lines.
+    """
+    try:
+        return decode_json(raw, backend)
+    except TransformError:
+        if not raw.lstrip().startswith("{"):
+            raise
+
+    return decode_lines(raw, backend)
+
+
+def decode_lines(
+    raw: str, backend: Optional[str] = None, first_line: int = 1
+) -> List[Any]:
+    """
+    Decode JSON Lines into a list of records, skipping blank lines (so
+    whitespace-only input is an empty list). first_line numbers the first
+    line of raw in error messages, for input decoded in pieces.
+    Raises TransformError naming the offending line.
+    """
+    records: List[Any] = []
+    for line_number, line in enumerate(raw.splitlines(), start=first_line):
+        if not line.strip():
+            continue
+        try:
+            records.append(decode_json(line, backend))
+        except TransformError as e:
+            raise TransformError(f"JSON Lines input, line {line_number}: {e}")
+    return records
+
+
+class RecordStream:
+    """
+    Incremental decode_records for input that arrives in text chunks:
+    feed() returns the records completed so far and close() the rest, so
+    decoding overlaps the download. The format is detected once, from the
+    first non-whitespace character:
+    - '[': array elements are decoded as each one completes (with the
+      standard library, whichever backend is selected)
+    - '{': JSON Lines, decoded line by line with the selected backend
+    - anything else is buffered and decoded by decode_records on close()
+
+    Accepts the same inputs as decode_records. The one difference is that
+    a lone object spread over several lines fails as invalid JSON Lines
+    (TransformError) rather than as a non-list (SchemaValidationError).
+    Raises TransformError on invalid input and SchemaValidationError when
+    the top-level value is not a list of records.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend
+        self.buffer = ""
+        self.format: Optional[str] = None
+
+        # JSON Lines: lines consumed and records decoded so far
+        self.line_count = 0
+        self.record_count = 0
+
+        # Array: the token expected next ("open", "first", "value",
+        # "separator" or "end")
+        self.expect = "open"
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.buffer += chunk
+        return self._decode(final=False)
+
+    def close(self) -> List[Any]:
+        return self._decode(final=True)
+
+    def _decode(self, final: bool) -> List[Any]:
+        if self.format is None:
+            start = self.buffer.lstrip()[:1]
+            if not start and not final:
+                return []
+            self.format = {"[": "array", "{": "lines"}.get(start, "document")
+
+        if self.format == "array":
+            return self._decode_array(final)
+        if self.format == "lines":
+            return self._decode_lines(final)
+        if not final:
+            return []
+
+        records = decode_records(self.buffer, self.backend)
+        self.buffer = ""
+        if not isinstance(records, list):
+            raise SchemaValidationError("Top-level JSON must be a list of orders")
+        return records
+
+    def _decode_lines(self, final: bool) -> List[Any]:
+        cut = len(self.buffer) if final else self.buffer.rfind("\n") + 1
+        complete, self.buffer = self.buffer[:cut], self.buffer[cut:]
+
+        records = decode_lines(complete, self.backend, self.line_count + 1)
+        self.line_count += len(complete.splitlines())
+        self.record_count += len(records)
+
+        # A single line is a lone object, which decode_records rejects too
+        if final and self.record_count == 1:
+            raise SchemaValidationError("Top-level JSON must be a list of orders")
+        return records
+
+    def _decode_array(self, final: bool) -> List[Any]:
+        buffer = self.buffer
+        pos = 0
+        records: List[Any] = []
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self.expect == "open":
+                if char != "[":
+                    raise TransformError("Invalid JSON input: expected '['")
+                pos += 1
+                self.expect = "first"
+            elif self.expect == "end":
+                raise TransformError("Invalid JSON input: extra data after array")
+            elif self.expect == "separator":
+                if char not in ",]":
+                    raise TransformError(
+                        "Invalid JSON input: expected ',' or ']' after array element"
+                    )
+                pos += 1
+                self.expect = "value" if char == "," else "end"
+            elif char == "]":
+                if self.expect == "value":
+                    raise TransformError("Invalid JSON input: trailing ',' in array")
+                pos += 1
+                self.expect = "end"
+            else:
+                try:
+                    record, end = _raw_decode(buffer, pos)
+                except ValueError as e:
+                    # Most likely an element cut off by the chunk boundary
+                    if final:
+                        raise TransformError(f"Invalid JSON input: {e}")
+                    break
+                # A value reaching the end of the chunk may be cut short, as
+                # may a number followed by what could be more of its digits
+                if not final and (
+                    end == len(buffer)
+                    or (isinstance(record, (int, float)) and buffer[end] in _NUMBER)
+                ):
+                    break
+                records.append(record)
+                pos = end
+                self.expect = "separator"
+
+        self.buffer = buffer[pos:]
+        if final and self.expect != "end":
+            raise TransformError("Invalid JSON input: unterminated array")
+        return records
@@ -12,6 +12,12 @@ class PipelineError(Exception):
     pass
 
 
+class ConfigurationError(PipelineError):
+    """Raised when a pipeline setting is missing or invalid."""
+
+    pass
+
+
 class InvalidEventError(PipelineError):
     """Raised when the incoming Lambda event is malformed."""
 
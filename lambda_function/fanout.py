@@ -0,0 +1,429 @@
+"""
+fanout.py
+
+Split-and-fan-out coordinator for inputs too large for one invocation.
+Coordinates:
+- Planning byte-range shards at safe record boundaries
+- Dispatching each shard to a worker invocation
+- Tracking shard completion in a shard manifest
+- Fan-in: streaming per-shard outputs into the final tables
+
+In Lambda each shard runs in its own invocation of FANOUT_WORKER_FUNCTION
+(this same function by default), so every shard gets its own memory and
+time budget. Workers write their tables to S3 and return only the output
+keys and statistics; the fan-in streams the shard objects one at a time
+into multipart uploads, keeping only the set of customer ids seen, then
+deletes them.
+
+Shards are cut at newline boundaries, so splitting requires JSON Lines
+input (one order object per line). A JSON array cannot be split safely
+without scanning it end to end, so array inputs plan to a single shard,
+which the handler processes on its normal path instead.
+"""
+
+import csv
+import io
+import json
+from contextlib import suppress
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+from .s3_utils import (
+    delete_processed_files,
+    get_object_size,
+    read_from_s3,
+    read_range_from_s3,
+    source_prefix,
+    write_processed_file,
+    write_processed_stream,
+)
+from .decoder import decode_lines, decode_records
+from .transform import OrderStats, to_csv, transform_records
+from . import errors
+from .errors import ConfigurationError, PipelineError, S3WriteError
+from . import config
+
+# Bytes fetched per probe when searching for a record boundary
+_BOUNDARY_WINDOW = 64 * 1024
+
+# Created on first use; only coordinators dispatching to Lambda need it
+_lambda = None
+
+
+def plan_shards(bucket: str, key: str, shard_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Split an object into [start, end) byte ranges of roughly shard_bytes.
+    Each range ends just after a newline, so no record straddles two shards.
+    Raises ConfigurationError if shard_bytes is below 1.
+    """
+    if shard_bytes < 1:
+        raise ConfigurationError(
+            f"FANOUT_SHARD_BYTES must be at least 1, got {shard_bytes}"
+        )
+
+    size = get_object_size(bucket, key)
+    if size == 0:
+        return []
+
+    # JSON arrays can't be cut at safe boundaries without a full scan
+    head = read_range_from_s3(bucket, key, 0, min(size, _BOUNDARY_WINDOW))
+    if head.lstrip()[:1] == b"[":
+        return [(0, size)]
+
+    shards = []
+    start = 0
+    while start < size:
+        end = _next_boundary(bucket, key, start + shard_bytes, size)
+        shards.append((start, end))
+        start = end
+    return shards
+
+
+def _next_boundary(bucket: str, key: str, offset: int, size: int) -> int:
+    """
+    Return the offset just past the first newline at or after `offset`
+    (or the object size if there is none), using small ranged reads.
+    """
+    window = _BOUNDARY_WINDOW
+    while offset < size:
+        chunk = read_range_from_s3(bucket, key, offset, min(offset + window, size))
+        newline = chunk.find(b"\n")
+        if newline != -1:
+            return offset + newline + 1
+        offset += len(chunk)
+        window *= 2
+    return size
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+def process_shard(
+    bucket: str,
+    key: str,
+    index: int,
+    start: int,
+    end: int,
+    product_dimension: bool = False,
+) -> dict:
+    """
+    Worker: transform one byte range and write its per-shard outputs.
+    Returns only the shard's output keys and statistics for the fan-in.
+    """
+    text = read_range_from_s3(bucket, key, start, end).decode("utf-8")
+
+    # Only an unsplit input can be an array (see plan_shards); any other
+    # shard is a run of JSON Lines, possibly nothing but blank lines
+    if text.lstrip().startswith("["):
+        orders = decode_records(text)
+    else:
+        orders = decode_lines(text)
+    tables, manifest = transform_records(orders, product_dimension)
+
+    prefix = f"{_shard_prefix(bucket, key)}{index:05d}/"
+    output_keys = {
+        name: write_processed_file(csv_data, f"{prefix}{name}.csv")
+        for name, csv_data in tables.items()
+    }
+
+    return {"index": index, "output_keys": output_keys, "manifest": manifest}
+
+
+def invoke_shard_worker(
+    bucket: str,
+    key: str,
+    index: int,
+    start: int,
+    end: int,
+    product_dimension: bool = False,
+) -> dict:
+    """
+    Run process_shard in a separate invocation of FANOUT_WORKER_FUNCTION.
+    Worker failures are re-raised as the worker's PipelineError subclass.
+    """
+    task = {
+        "bucket": bucket,
+        "key": key,
+        "index": index,
+        "start": start,
+        "end": end,
+        "product_dimension": product_dimension,
+    }
+
+    try:
+        response = _lambda_client().invoke(
+            FunctionName=config.FANOUT_WORKER_FUNCTION,
+            InvocationType="RequestResponse",
+            Payload=json.dumps({"fanout_shard": task}).encode("utf-8"),
+        )
+        payload = json.loads(response["Payload"].read())
+    except (BotoCoreError, ClientError) as e:
+        raise PipelineError(f"Failed to invoke worker for shard {index}: {e}")
+
+    if response.get("FunctionError"):
+        raise PipelineError(f"Worker for shard {index} crashed: {payload}")
+
+    body = json.loads(payload["body"])
+    if payload["statusCode"] != 200:
+        error_cls = getattr(errors, body.get("error_type", ""), PipelineError)
+        if not (isinstance(error_cls, type) and issubclass(error_cls, PipelineError)):
+            error_cls = PipelineError
+        raise error_cls(body.get("error", f"Worker for shard {index} failed"))
+    return body
+
+
+def _lambda_client():
+    global _lambda
+    if _lambda is None:
+        # Workers can run for minutes; don't let the client time out or retry
+        _lambda = boto3.client(
+            "lambda",
+            config=Config(
+                read_timeout=config.FANOUT_WORKER_TIMEOUT_SECONDS,
+                retries={"max_attempts": 0},
+            ),
+        )
+    return _lambda
+
+
+# -----------------------------
+# Fan-in
+# -----------------------------
+def merge_shards(results: List[dict], product_dimension: bool = False) -> List[str]:
+    """
+    Fan-in: stream per-shard tables from S3 into the final outputs in
+    shard order, one shard object in memory at a time. Customers are
+    deduplicated globally (first occurrence wins, as in a single pass)
+    and product ids re-keyed onto one global dimension.
+    Returns the output keys: tables, then the statistics manifest last.
+    """
+    results = sorted(results, key=lambda r: r["index"])
+    seen_customers: Set[str] = set()
+
+    products_index: Dict[tuple, int] = {}
+    local_product_ids: Dict[int, Dict[str, int]] = {}
+    if product_dimension:
+        products_index, local_product_ids = _merge_products(results)
+
+    output_keys = [
+        write_processed_stream(_concat_table(results, "orders"), "orders.csv"),
+        write_processed_stream(
+            _dedupe_customers(results, seen_customers), "customers.csv"
+        ),
+        write_processed_stream(
+            (
+                _remap_items(results, local_product_ids)
+                if product_dimension
+                else _concat_table(results, "items")
+            ),
+            "items.csv",
+        ),
+    ]
+
+    if product_dimension:
+        output_keys.append(
+            write_processed_file(
+                to_csv(
+                    [
+                        {"product_id": pid, "product_name": name, "unit_price": price}
+                        for (name, price), pid in products_index.items()
+                    ]
+                ),
+                "products.csv",
+            )
+        )
+
+    # Customer and product counts come from the global dedupe, not a sum
+    stats = OrderStats()
+    for result in results:
+        stats.merge(result["manifest"])
+    manifest = stats.manifest(
+        len(seen_customers), len(products_index) if product_dimension else None
+    )
+    output_keys.append(
+        write_processed_file(json.dumps(manifest), config.MANIFEST_FILENAME)
+    )
+    return output_keys
+
+
+def _read_shard_table(result: dict, table: str) -> str:
+    return read_from_s3(config.OUTPUT_BUCKET, result["output_keys"][table])
+
+
+def _concat_table(results: List[dict], table: str) -> Iterator[str]:
+    """Yield each shard's CSV, keeping only the first shard's header."""
+    header_written = False
+    for result in results:
+        data = _read_shard_table(result, table)
+        if not data:
+            continue
+        if header_written:
+            data = data.partition("\n")[2]
+        header_written = True
+        yield data
+
+
+def _dedupe_customers(results: List[dict], seen: Set[str]) -> Iterator[str]:
+    """Yield customer rows not seen in an earlier shard, recording their ids."""
+    header_written = False
+    for result in results:
+        rows = []
+        for row in _read_csv(_read_shard_table(result, "customers")):
+            if row["customer_id"] not in seen:
+                seen.add(row["customer_id"])
+                rows.append(row)
+        if rows:
+            yield to_csv(rows, header=not header_written)
+            header_written = True
+
+
+def _merge_products(results: List[dict]):
+    """
+    Build the global product index from the (small) per-shard product
+    tables, plus each shard's local id → global id mapping.
+    """
+    products_index: Dict[tuple, int] = {}
+    local_product_ids: Dict[int, Dict[str, int]] = {}
+    for result in results:
+        local_ids = local_product_ids.setdefault(result["index"], {})
+        for row in _read_csv(_read_shard_table(result, "products")):
+            product_key = (row["product_name"], row["unit_price"])
+            if product_key not in products_index:
+                products_index[product_key] = len(products_index) + 1
+            local_ids[row["product_id"]] = products_index[product_key]
+    return products_index, local_product_ids
+
+
+def _remap_items(
+    results: List[dict], local_product_ids: Dict[int, Dict[str, int]]
+) -> Iterator[str]:
+    """Yield each shard's item rows with product ids mapped to global ids."""
+    header_written = False
+    for result in results:
+        local_ids = local_product_ids[result["index"]]
+        rows = _read_csv(_read_shard_table(result, "items"))
+        for row in rows:
+            row["product_id"] = local_ids[row["product_id"]]
+        if rows:
+            yield to_csv(rows, header=not header_written)
+            header_written = True
+
+
+# -----------------------------
+# Coordinator
+# -----------------------------
+def run_fanout(
+    bucket: str,
+    key: str,
+    product_dimension: bool = False,
+    shard_bytes: Optional[int] = None,
+    shards: Optional[List[Tuple[int, int]]] = None,
+    executor: Optional[Executor] = None,
+    worker: Callable[..., dict] = process_shard,
+) -> List[str]:
+    """
+    Split s3://bucket/key into shards, run `worker` on each, then merge.
+
+    shards: byte ranges already planned by plan_shards, if any; otherwise
+    the object is planned here with shard_bytes.
+    worker: process_shard to transform shards in the executor itself, or
+    invoke_shard_worker to run each shard in its own Lambda invocation.
+    executor: where workers are scheduled. Defaults to a local process pool
+    (one process per CPU unless FANOUT_MAX_WORKERS caps it); with
+    invoke_shard_worker a thread pool suffices, as threads only wait.
+
+    Returns the merged output keys (tables, then the statistics manifest).
+    Raises the first shard's PipelineError after recording every shard's
+    status in the shard manifest. Per-shard tables are deleted once the
+    fan-in succeeds or fails; only the shard manifest is kept.
+    """
+    if shards is None:
+        shard_bytes = config.FANOUT_SHARD_BYTES if shard_bytes is None else shard_bytes
+        shards = plan_shards(bucket, key, shard_bytes)
+
+    shard_manifest = {
+        "source": f"s3://{bucket}/{key}",
+        "shards": [
+            {
+                "index": index,
+                "start": start,
+                "end": end,
+                "status": "pending",
+                "output_keys": {},
+            }
+            for index, (start, end) in enumerate(shards)
+        ],
+    }
+    manifest_name = f"{_shard_prefix(bucket, key)}{config.SHARD_MANIFEST_FILENAME}"
+    write_processed_file(json.dumps(shard_manifest), manifest_name)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=config.FANOUT_MAX_WORKERS or None)
+
+    results = []
+    first_error = None
+    try:
+        futures = {
+            executor.submit(
+                worker, bucket, key, index, start, end, product_dimension
+            ): index
+            for index, (start, end) in enumerate(shards)
+        }
+
+        for future in as_completed(futures):
+            entry = shard_manifest["shards"][futures[future]]
+            try:
+                result = future.result()
+            except Exception as e:
+                entry["status"] = "failed"
+                entry["error"] = str(e)
+                if first_error is None:
+                    first_error = (
+                        e
+                        if isinstance(e, PipelineError)
+                        else PipelineError(f"Shard {entry['index']} failed: {e}")
+                    )
+            else:
+                entry["status"] = "complete"
+                entry["output_keys"] = result["output_keys"]
+                results.append(result)
+
+            write_processed_file(json.dumps(shard_manifest), manifest_name)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    # Shard tables live under PROCESSED_PREFIX, so remove them once the
+    # fan-in is over (successful or not) or consumers would see every row
+    # twice. The shard manifest stays as the record of the run.
+    shard_keys = [key for result in results for key in result["output_keys"].values()]
+    try:
+        if first_error is not None:
+            raise first_error
+        output_keys = merge_shards(results, product_dimension)
+    except Exception:
+        # Best effort: the original error matters more than the cleanup
+        with suppress(S3WriteError):
+            delete_processed_files(shard_keys)
+        raise
+
+    delete_processed_files(shard_keys)
+    return output_keys
+
+
+def _shard_prefix(bucket: str, key: str) -> str:
+    """
+    Location of per-shard outputs for one input: _shards/<bucket>/<key>/
+    """
+    return f"_shards/{source_prefix(bucket, key)}"
+
+
+def _read_csv(data: str) -> List[dict]:
+    if not data:
+        return []
+    return list(csv.DictReader(io.StringIO(data)))
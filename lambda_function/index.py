@@ -6,16 +6,20 @@ Coordinates:
 - Event parsing
 - S3 read
 - Data transformation
-- S3 writes (multiple CSVs)
+- S3 writes (multiple CSVs + statistics manifest)
 - Structured response building
 """
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from .s3_utils import write_processed_file, read_from_s3
-from .transform import transform_data
+from .s3_utils import write_processed_file, read_from_s3, get_object_size
+from .transform import transform_with_stats
+from .pipeline import run_pipeline
+from .fanout import invoke_shard_worker, plan_shards, process_shard, run_fanout
 from .errors import (
+    ConfigurationError,
     PipelineError,
     InvalidEventError,
     S3ReadError,
@@ -41,6 +45,42 @@ def handler(event, context):
     )
 
     try:
+        # Fan-out worker: transform one byte range of a large input
+        if "fanout_shard" in event:
+            result = process_shard(**event["fanout_shard"])
+            logger.info(
+                {
+                    "event": "SHARD_SUCCESS",
+                    "request_id": request_id,
+                    "shard": result["index"],
+                    "output_keys": result["output_keys"],
+                }
+            )
+            return build_response(200, result)
+
+        # Pipelined mode: read/transform/write run as concurrent stages
+        if config.PIPELINE_MODE:
+            sources = parse_records(event)
+            logger.info(
+                {
+                    "event": "EVENT_PARSED",
+                    "request_id": request_id,
+                    "sources": [f"s3://{b}/{k}" for b, k in sources],
+                }
+            )
+
+            output_keys = run_pipeline(
+                sources, product_dimension=config.PRODUCT_DIMENSION
+            )
+            logger.info(
+                {
+                    "event": "PIPELINE_SUCCESS",
+                    "request_id": request_id,
+                    "output_keys": output_keys,
+                }
+            )
+            return build_response(200, {"processed_files": output_keys})
+
         # Step 1: Parse event
         bucket, key = parse_event(event)
         logger.info(
@@ -52,6 +92,50 @@ def handler(event, context):
             }
         )
 
+        # Large inputs: split into shards, run each in its own worker
+        # invocation, then merge. The threads here only wait on invokes.
+        # An input that can't be split (one shard) gains nothing from a
+        # worker and takes the normal path below.
+        if config.FANOUT_THRESHOLD_BYTES:
+            size = get_object_size(bucket, key)
+            shards = []
+            if size > config.FANOUT_THRESHOLD_BYTES:
+                shards = plan_shards(bucket, key, config.FANOUT_SHARD_BYTES)
+
+            if len(shards) > 1:
+                if not config.FANOUT_WORKER_FUNCTION:
+                    raise ConfigurationError(
+                        "FANOUT_WORKER_FUNCTION must be set to fan out large inputs"
+                    )
+                if config.FANOUT_MAX_WORKERS < 0:
+                    raise ConfigurationError(
+                        "FANOUT_MAX_WORKERS must be 0 (no cap) or more, "
+                        f"got {config.FANOUT_MAX_WORKERS}"
+                    )
+
+                # All shards in flight at once unless capped, so the
+                # coordinator waits about as long as the slowest shard
+                workers = min(config.FANOUT_MAX_WORKERS or len(shards), len(shards))
+                with ThreadPoolExecutor(workers) as executor:
+                    output_keys = run_fanout(
+                        bucket,
+                        key,
+                        product_dimension=config.PRODUCT_DIMENSION,
+                        shards=shards,
+                        executor=executor,
+                        worker=invoke_shard_worker,
+                    )
+                logger.info(
+                    {
+                        "event": "FANOUT_SUCCESS",
+                        "request_id": request_id,
+                        "bytes": size,
+                        "shards": len(shards),
+                        "output_keys": output_keys,
+                    }
+                )
+                return build_response(200, {"processed_files": output_keys})
+
         # Step 2: Read raw data
         raw_data = read_from_s3(bucket, key)
         logger.info(
@@ -63,7 +147,9 @@ def handler(event, context):
         )
 
         # Step 3: Transform
-        transformed_data = transform_data(raw_data)
+        transformed_data, manifest = transform_with_stats(
+            raw_data, product_dimension=config.PRODUCT_DIMENSION
+        )
         logger.info(
             {
                 "event": "TRANSFORM_SUCCESS",
@@ -87,14 +173,29 @@ def handler(event, context):
                 }
             )
 
-        # Step 5: Respond
+        # Step 5: Write the statistics manifest last, so its presence
+        # signals that every table it describes is already in place
+        manifest_key = write_processed_file(
+            json.dumps(manifest), config.MANIFEST_FILENAME
+        )
+        output_keys.append(manifest_key)
+
+        logger.info(
+            {
+                "event": "MANIFEST_WRITE_SUCCESS",
+                "request_id": request_id,
+                "output_key": manifest_key,
+            }
+        )
+
+        # Step 6: Respond
         return build_response(200, {"processed_files": output_keys})
 
     except Exception as e:
         logger.exception(
             {"event": "UNEXPECTED_ERROR", "request_id": request_id, "error": str(e)}
         )
-        return build_response(500, {"error": str(e)})
+        return build_response(500, {"error": str(e), "error_type": type(e).__name__})
 
 
 def parse_event(event):
@@ -110,6 +211,23 @@ def parse_event(event):
         raise InvalidEventError(f"Malformed S3 event structure: {e}")
 
 
+def parse_records(event):
+    """
+    Extract (bucket, key) for every record in the S3 event.
+    """
+    try:
+        sources = [
+            (record["s3"]["bucket"]["name"], record["s3"]["object"]["key"])
+            for record in event["Records"]
+        ]
+    except (KeyError, TypeError) as e:
+        raise InvalidEventError(f"Malformed S3 event structure: {e}")
+
+    if not sources:
+        raise InvalidEventError("S3 event contains no records")
+    return sources
+
+
 def build_response(status_code, body):
     """
     Build a structured Lambda response.
@@ -0,0 +1,392 @@
+"""
+pipeline.py
+
+Pipelined execution mode for the automated serverless pipeline.
+Streams each object through concurrent stages connected by bounded
+queues, so the download, parsing/validation and upload of one object
+overlap instead of running one after the other:
+- Read stage: streams objects from S3 in chunks (several workers, one
+  object each at a time)
+- Transform stage: decodes records as each chunk arrives and turns them
+  into CSV rows, cutting every table into upload parts as it grows
+- Write stage: uploads parts as soon as they are ready, completes each
+  table's multipart upload, then writes each source's manifest last
+  (several workers)
+
+Bounded queues give backpressure: a slow stage blocks the one feeding it
+instead of letting payloads pile up in memory. The first failure stops
+every stage, aborts unfinished uploads and is re-raised as the matching
+PipelineError subclass.
+
+Both JSON arrays and JSON Lines stream (see decoder.RecordStream). Tables
+smaller than one part (MULTIPART_PART_BYTES) go out in a single put once
+their source has been read to the end.
+"""
+
+import json
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .s3_utils import (
+    abort_processed_upload,
+    complete_processed_upload,
+    source_prefix,
+    start_processed_upload,
+    stream_from_s3,
+    upload_processed_part,
+    write_processed_file,
+)
+from .decoder import RecordStream
+from .transform import OrderTransformer, to_csv
+from .errors import (
+    ConfigurationError,
+    PipelineError,
+    S3ReadError,
+    S3WriteError,
+    TransformError,
+)
+from . import config
+
+# Marks the end of a queue's input
+_DONE = object()
+
+# Marks the end of one source's chunks
+_END = object()
+
+# How often blocked stages re-check for a failure elsewhere (seconds)
+_POLL_INTERVAL = 0.05
+
+
+class _TableUpload:
+    """One output table, uploaded in parts while its rows are produced."""
+
+    def __init__(self, idx: int, seq: int, filename: str):
+        self.idx = idx
+        self.seq = seq
+        self.filename = filename
+
+        # Owned by the transform stage
+        self.header_written = False
+        self.buffer = bytearray()
+        self.next_part = 1
+
+        # Shared with the write stage (under the pipeline lock)
+        self.pending_jobs = 0
+        self.closed = False
+        self.parts: List[dict] = []
+        self.completed = False
+
+        # Started by whichever writer uploads the first part
+        self.upload_id: Optional[str] = None
+        self.upload_lock = threading.Lock()
+
+
+class _Pipeline:
+    def __init__(
+        self,
+        sources,
+        product_dimension,
+        queue_size,
+        read_workers,
+        write_workers,
+        chunk_bytes,
+    ):
+        self.sources = sources
+        self.product_dimension = product_dimension
+        self.read_workers = read_workers
+        self.write_workers = write_workers
+        self.chunk_bytes = chunk_bytes
+        self.part_bytes = config.MULTIPART_PART_BYTES
+
+        self.source_q: queue.Queue = queue.Queue()
+        self.raw_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.write_q: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        self.stop = threading.Event()
+        self.error: Optional[PipelineError] = None
+        self.lock = threading.Lock()
+
+        # Tables still pending per source; the manifest goes out when it hits 0
+        self.tables: List[_TableUpload] = []
+        self.pending_tables: Dict[int, int] = {}
+        self.manifests: Dict[int, dict] = {}
+        self.output_keys: List[Tuple[int, float, str]] = []
+
+    # -----------------------------
+    # Queue helpers (abort-aware)
+    # -----------------------------
+    def put(self, q: queue.Queue, item) -> bool:
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, q: queue.Queue):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def fail(self, error: PipelineError):
+        with self.lock:
+            if self.error is None:
+                self.error = error
+        self.stop.set()
+
+    def run_stage(self, target, wrap_cls):
+        try:
+            target()
+        except PipelineError as e:
+            self.fail(e)
+        except Exception as e:
+            self.fail(wrap_cls(f"Unexpected error in pipeline stage: {e}"))
+
+    # -----------------------------
+    # Stages
+    # -----------------------------
+    def read_stage(self):
+        while True:
+            try:
+                idx, (bucket, key) = self.source_q.get_nowait()
+            except queue.Empty:
+                break
+            for chunk in stream_from_s3(bucket, key, self.chunk_bytes):
+                if not self.put(self.raw_q, (idx, chunk)):
+                    return
+            if not self.put(self.raw_q, (idx, _END)):
+                return
+        self.put(self.raw_q, _DONE)
+
+    def transform_stage(self):
+        # Sources in progress: idx → (decoder, transformer, tables by name)
+        open_sources = {}
+        finished_readers = 0
+        while finished_readers < self.read_workers:
+            item = self.get(self.raw_q)
+            if item is _DONE:
+                if self.stop.is_set():
+                    return
+                finished_readers += 1
+                continue
+
+            idx, chunk = item
+            if idx not in open_sources:
+                open_sources[idx] = self.open_source(idx)
+            records, transformer, tables = open_sources[idx]
+
+            batch = records.close() if chunk is _END else records.feed(chunk)
+            for name, rows in transformer.transform(batch).items():
+                if not self.append_rows(tables[name], rows):
+                    return
+
+            if chunk is not _END:
+                continue
+
+            # Source fully read: finish its tables, manifest queued behind them
+            del open_sources[idx]
+            if self.product_dimension:
+                if not self.append_rows(tables["products"], transformer.products()):
+                    return
+            with self.lock:
+                self.pending_tables[idx] = len(tables)
+                self.manifests[idx] = transformer.manifest()
+            for table in tables.values():
+                if not self.queue_upload(table, last=True):
+                    return
+
+        for _ in range(self.write_workers):
+            self.put(self.write_q, _DONE)
+
+    def write_stage(self):
+        while True:
+            job = self.get(self.write_q)
+            if job is _DONE:
+                return
+
+            table, number, data = job
+            output_key = None
+            if number is None:
+                # The whole table fit in one part
+                output_key = write_processed_file(data.decode("utf-8"), table.filename)
+            elif data:
+                part = upload_processed_part(
+                    table.filename, self.upload_id(table), number, data
+                )
+                with self.lock:
+                    table.parts.append(part)
+
+            with self.lock:
+                table.pending_jobs -= 1
+                finished = table.closed and table.pending_jobs == 0
+
+            if not finished:
+                continue
+            if output_key is None:
+                output_key = complete_processed_upload(
+                    table.filename, table.upload_id, table.parts
+                )
+            self.table_written(table, output_key)
+
+    # -----------------------------
+    # Table uploads
+    # -----------------------------
+    def open_source(self, idx: int):
+        transformer = OrderTransformer(self.product_dimension)
+        tables = {
+            name: _TableUpload(idx, seq, self.output_filename(idx, f"{name}.csv"))
+            for seq, name in enumerate(transformer.table_names())
+        }
+        self.tables.extend(tables.values())
+        return RecordStream(), transformer, tables
+
+    def append_rows(self, table: _TableUpload, rows: List[dict]) -> bool:
+        if not rows:
+            return True
+
+        table.buffer += to_csv(rows, header=not table.header_written).encode("utf-8")
+        table.header_written = True
+        if len(table.buffer) < self.part_bytes:
+            return True
+        return self.queue_upload(table, last=False)
+
+    def queue_upload(self, table: _TableUpload, last: bool) -> bool:
+        """
+        Hand the table's buffered bytes to the writers: as the next part,
+        or as a single put if the table is complete and never needed a part.
+        """
+        if last and table.next_part == 1:
+            number = None
+        else:
+            number = table.next_part
+            table.next_part += 1
+
+        data = bytes(table.buffer)
+        table.buffer = bytearray()
+
+        # Counted before queueing, so no writer sees the table finish early
+        with self.lock:
+            table.pending_jobs += 1
+            table.closed = last
+        return self.put(self.write_q, (table, number, data))
+
+    def upload_id(self, table: _TableUpload) -> str:
+        with table.upload_lock:
+            if table.upload_id is None:
+                table.upload_id = start_processed_upload(table.filename)
+            return table.upload_id
+
+    def table_written(self, table: _TableUpload, output_key: str):
+        with self.lock:
+            table.completed = True
+            self.output_keys.append((table.idx, table.seq, output_key))
+            self.pending_tables[table.idx] -= 1
+            manifest_ready = self.pending_tables[table.idx] == 0
+            manifest = self.manifests.pop(table.idx) if manifest_ready else None
+
+        # Last table for this source: its manifest can now go out
+        if manifest is not None:
+            manifest_name = self.output_filename(table.idx, config.MANIFEST_FILENAME)
+            manifest_key = write_processed_file(json.dumps(manifest), manifest_name)
+            with self.lock:
+                # Sorts after every table of the same source
+                self.output_keys.append((table.idx, float("inf"), manifest_key))
+
+    def output_filename(self, idx: int, filename: str) -> str:
+        """
+        Single-source runs keep the flat processed/<table>.csv layout;
+        multi-source runs namespace outputs by bucket and full key so they
+        don't collide.
+        """
+        if len(self.sources) == 1:
+            return filename
+        bucket, key = self.sources[idx]
+        return f"{source_prefix(bucket, key)}{filename}"
+
+    # -----------------------------
+    # Orchestration
+    # -----------------------------
+    def run(self) -> List[str]:
+        for idx, source in enumerate(self.sources):
+            self.source_q.put((idx, source))
+
+        threads = [
+            threading.Thread(target=self.run_stage, args=(self.read_stage, S3ReadError))
+            for _ in range(self.read_workers)
+        ]
+        threads.append(
+            threading.Thread(
+                target=self.run_stage, args=(self.transform_stage, TransformError)
+            )
+        )
+        threads.extend(
+            threading.Thread(
+                target=self.run_stage, args=(self.write_stage, S3WriteError)
+            )
+            for _ in range(self.write_workers)
+        )
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self.error is not None:
+            for table in self.tables:
+                if table.upload_id is not None and not table.completed:
+                    abort_processed_upload(table.filename, table.upload_id)
+            raise self.error
+
+        return [key for _, _, key in sorted(self.output_keys)]
+
+
+def run_pipeline(
+    sources: List[Tuple[str, str]],
+    product_dimension: bool = False,
+    queue_size: Optional[int] = None,
+    read_workers: Optional[int] = None,
+    write_workers: Optional[int] = None,
+    chunk_bytes: Optional[int] = None,
+) -> List[str]:
+    """
+    Stream (bucket, key) sources through concurrent read/transform/write stages.
+    Returns the output keys written, grouped by source in input order.
+    Raises S3ReadError, TransformError (or SchemaValidationError) or S3WriteError,
+    and ConfigurationError if a queue size, worker count or chunk size is below 1.
+    """
+    settings = {
+        "PIPELINE_QUEUE_SIZE": (
+            config.PIPELINE_QUEUE_SIZE if queue_size is None else queue_size
+        ),
+        "PIPELINE_READ_WORKERS": (
+            config.PIPELINE_READ_WORKERS if read_workers is None else read_workers
+        ),
+        "PIPELINE_WRITE_WORKERS": (
+            config.PIPELINE_WRITE_WORKERS if write_workers is None else write_workers
+        ),
+        "PIPELINE_CHUNK_BYTES": (
+            config.PIPELINE_CHUNK_BYTES if chunk_bytes is None else chunk_bytes
+        ),
+    }
+    for name, value in settings.items():
+        if value < 1:
+            raise ConfigurationError(f"{name} must be at least 1, got {value}")
+
+    if not sources:
+        return []
+
+    pipeline = _Pipeline(
+        sources,
+        product_dimension,
+        queue_size=settings["PIPELINE_QUEUE_SIZE"],
+        read_workers=min(settings["PIPELINE_READ_WORKERS"], len(sources)),
+        write_workers=settings["PIPELINE_WRITE_WORKERS"],
+        chunk_bytes=settings["PIPELINE_CHUNK_BYTES"],
+    )
+    return pipeline.run()
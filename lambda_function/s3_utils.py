@@ -3,11 +3,15 @@ s3_utils.py
 
 Helper utilities for interacting with Amazon S3.
 Handles:
-- Reading raw files
-- Writing processed CSV files
+- Reading raw files (whole, by byte range or streamed in chunks)
+- Writing processed CSV files (whole or streamed as a multipart upload)
+- Deleting intermediate processed files
 - Generating output keys
 """
 
+import codecs
+from typing import Iterable, Iterator, List
+
 import boto3
 from botocore.exceptions import ClientError
 from .errors import S3ReadError, S3WriteError
@@ -24,6 +28,62 @@ def read_from_s3(bucket: str, key: str) -> str:
         raise S3ReadError(f"Failed to read s3://{bucket}/{key}: {e}")
 
 
+def stream_from_s3(bucket: str, key: str, chunk_bytes: int) -> Iterator[str]:
+    """
+    Yield an object's text in chunks of about chunk_bytes as it downloads,
+    from a single GET. Multi-byte characters split across chunks are
+    carried over, so every chunk decodes cleanly.
+    """
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        while True:
+            data = body.read(chunk_bytes)
+            if not data:
+                break
+            yield decoder.decode(data)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+    except ClientError as e:
+        raise S3ReadError(f"Failed to read s3://{bucket}/{key}: {e}")
+
+
+def get_object_size(bucket: str, key: str) -> int:
+    try:
+        response = s3.head_object(Bucket=bucket, Key=key)
+        return response["ContentLength"]
+    except ClientError as e:
+        raise S3ReadError(f"Failed to stat s3://{bucket}/{key}: {e}")
+
+
+def read_range_from_s3(bucket: str, key: str, start: int, end: int) -> bytes:
+    """
+    Read bytes [start, end) of an object with a ranged GET.
+    Returns raw bytes so callers can split safely before decoding.
+    """
+    if end <= start:
+        return b""
+
+    try:
+        response = s3.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end - 1}"
+        )
+        return response["Body"].read()
+    except ClientError as e:
+        raise S3ReadError(
+            f"Failed to read s3://{bucket}/{key} bytes {start}-{end - 1}: {e}"
+        )
+
+
+def source_prefix(bucket: str, key: str) -> str:
+    """
+    Output prefix unique to one input object: '<bucket>/<key>/'.
+    Uses the full key so same-named inputs in different folders don't collide.
+    """
+    return f"{bucket}/{key}/"
+
+
 def write_processed_file(data: str, filename: str) -> str:
     """
     Write a single CSV file to S3.
@@ -40,3 +100,127 @@ def write_processed_file(data: str, filename: str) -> str:
         return output_key
     except ClientError as e:
         raise S3WriteError(f"Failed to write processed file to {output_key}: {e}")
+
+
+def delete_processed_files(output_keys: List[str]):
+    """
+    Delete processed files by output key (as returned by the writers),
+    in batches of up to 1000 keys per request.
+    """
+    for start in range(0, len(output_keys), 1000):
+        batch = output_keys[start : start + 1000]
+        try:
+            response = s3.delete_objects(
+                Bucket=config.OUTPUT_BUCKET,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+        except ClientError as e:
+            raise S3WriteError(f"Failed to delete processed files: {e}")
+
+        if response.get("Errors"):
+            failed = ", ".join(error["Key"] for error in response["Errors"])
+            raise S3WriteError(f"Failed to delete processed files: {failed}")
+
+
+def write_processed_stream(chunks: Iterable[str], filename: str) -> str:
+    """
+    Write a processed file from an iterable of text chunks without holding
+    it all in memory. Chunks are buffered into parts of at least
+    config.MULTIPART_PART_BYTES and sent as a multipart upload; output that
+    fits in one part is written with a single put_object instead.
+    """
+    buffer = bytearray()
+    upload_id = None
+    parts: List[dict] = []
+
+    try:
+        for chunk in chunks:
+            buffer += chunk.encode("utf-8")
+            if len(buffer) < config.MULTIPART_PART_BYTES:
+                continue
+
+            if upload_id is None:
+                upload_id = start_processed_upload(filename)
+            parts.append(
+                upload_processed_part(filename, upload_id, len(parts) + 1, buffer)
+            )
+            buffer = bytearray()
+
+        if upload_id is None:
+            return write_processed_file(buffer.decode("utf-8"), filename)
+
+        if buffer:
+            parts.append(
+                upload_processed_part(filename, upload_id, len(parts) + 1, buffer)
+            )
+        return complete_processed_upload(filename, upload_id, parts)
+    except Exception:
+        if upload_id is not None:
+            abort_processed_upload(filename, upload_id)
+        raise
+
+
+# -----------------------------
+# Multipart upload steps, for callers that produce parts themselves.
+# Parts other than the last must be at least 5 MB.
+# -----------------------------
+def start_processed_upload(filename: str) -> str:
+    """Start a multipart upload of a processed file; returns its upload id."""
+    output_key = f"{config.PROCESSED_PREFIX}{filename}"
+
+    try:
+        response = s3.create_multipart_upload(
+            Bucket=config.OUTPUT_BUCKET, Key=output_key
+        )
+        return response["UploadId"]
+    except ClientError as e:
+        raise S3WriteError(f"Failed to write processed file to {output_key}: {e}")
+
+
+def upload_processed_part(
+    filename: str, upload_id: str, number: int, data: bytes
+) -> dict:
+    """Upload part `number` (from 1); returns the part entry for completion."""
+    output_key = f"{config.PROCESSED_PREFIX}{filename}"
+
+    try:
+        response = s3.upload_part(
+            Bucket=config.OUTPUT_BUCKET,
+            Key=output_key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=bytes(data),
+        )
+        return {"ETag": response["ETag"], "PartNumber": number}
+    except ClientError as e:
+        raise S3WriteError(f"Failed to write processed file to {output_key}: {e}")
+
+
+def complete_processed_upload(filename: str, upload_id: str, parts: List[dict]) -> str:
+    """Assemble the uploaded parts in part-number order; returns the key."""
+    output_key = f"{config.PROCESSED_PREFIX}{filename}"
+
+    try:
+        s3.complete_multipart_upload(
+            Bucket=config.OUTPUT_BUCKET,
+            Key=output_key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": sorted(parts, key=lambda part: part["PartNumber"])
+            },
+        )
+        return output_key
+    except ClientError as e:
+        raise S3WriteError(f"Failed to write processed file to {output_key}: {e}")
+
+
+def abort_processed_upload(filename: str, upload_id: str):
+    """Best-effort abort, so a failed run leaves no orphaned parts."""
+    try:
+        s3.abort_multipart_upload(
+            Bucket=config.OUTPUT_BUCKET,
+            Key=f"{config.PROCESSED_PREFIX}{filename}",
+            UploadId=upload_id,
+        )
+    except ClientError:
+        pass
@@ -5,40 +5,218 @@ Business logic for transforming raw JSON ecommerce data into
 normalized CSV tables for downstream processing.
 """
 
-import json
 import csv
 import io
-from typing import Dict, List
+import json
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
 
-from .errors import TransformError, SchemaValidationError
+from .errors import SchemaValidationError
+from .decoder import decode_records
 
 
-def transform_data(raw_json: str) -> Dict[str, str]:
+def to_csv(rows: List[dict], header: bool = True) -> str:
     """
-    Transform raw JSON orders into three normalized CSV datasets:
-    - orders.csv
-    - customers.csv (deduplicated)
-    - order_items.csv
+    Serialize a list of row dicts to a CSV string (empty string if no rows).
+    header=False omits the header row, for chunks appended to a table.
+    """
+    if not rows:
+        return ""
+
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=rows[0].keys())
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def _as_number(value) -> float:
+    """
+    Numeric value of an amount for statistics: finite numbers and numeric
+    strings as-is, anything else (None, bools, NaN, free text) as 0.
+    """
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            try:
+                value = float(value)
+            except ValueError:
+                return 0
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0
+    return value if math.isfinite(value) else 0
+
 
-    Returns a dict containing CSV strings.
+def _histogram_key(value) -> str:
+    """Histogram bucket for a value; non-strings use their JSON form."""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def transform_data(raw_json: str, product_dimension: bool = False) -> Dict[str, str]:
+    """
+    Transform raw JSON orders into normalized CSV datasets.
+    See transform_with_stats for details; this variant drops the statistics.
+    """
+    tables, _ = transform_with_stats(raw_json, product_dimension)
+    return tables
+
+
+def transform_with_stats(
+    raw_json: str, product_dimension: bool = False
+) -> Tuple[Dict[str, str], dict]:
+    """
+    Transform raw JSON orders (a JSON array or JSON Lines) into normalized
+    CSV datasets plus a statistics manifest; see transform_records.
     Raises TransformError or SchemaValidationError on invalid input.
     """
 
     # -----------------------------
     # Parse JSON safely
     # -----------------------------
-    try:
-        orders = json.loads(raw_json)
-    except json.JSONDecodeError as e:
-        raise TransformError(f"Invalid JSON input: {e}")
+    orders = decode_records(raw_json)
+    return transform_records(orders, product_dimension)
+
 
+def transform_records(
+    orders: list, product_dimension: bool = False
+) -> Tuple[Dict[str, str], dict]:
+    """
+    Transform decoded orders into three normalized CSV datasets:
+    - orders.csv
+    - customers.csv (deduplicated)
+    - order_items.csv
+
+    With product_dimension=True, a fourth products.csv is emitted holding
+    each distinct (product_name, unit_price) once, and items reference it
+    by a compact surrogate product_id instead of repeating those columns.
+
+    Per-table statistics (row counts, order_date range, total_amount sum,
+    distinct customers, status and payment histograms) are gathered in the
+    same pass, so consumers can plan reads without scanning the CSVs.
+    Non-string dates are left out of the range and non-numeric amounts
+    count as 0 in the sums.
+
+    Returns (dict of CSV strings, statistics manifest dict).
+    Raises SchemaValidationError on invalid records.
+    """
     if not isinstance(orders, list):
         raise SchemaValidationError("Top-level JSON must be a list of orders")
 
-    # Storage for normalized tables
-    orders_rows: List[dict] = []
-    customers_dict: Dict[str, dict] = {}
-    items_rows: List[dict] = []
+    transformer = OrderTransformer(product_dimension)
+    rows = transformer.transform(orders)
+
+    # -----------------------------
+    # Convert lists → CSV strings
+    # -----------------------------
+    tables = {name: to_csv(table_rows) for name, table_rows in rows.items()}
+    if product_dimension:
+        tables["products"] = to_csv(transformer.products())
+
+    return tables, transformer.manifest()
+
+
+class OrderStats:
+    """
+    Running per-table statistics for the manifest, updated as orders and
+    items are transformed, or merged from the manifests of partial runs.
+    """
+
+    def __init__(self):
+        self.order_count = 0
+        self.min_order_date = None
+        self.max_order_date = None
+        self.total_amount_sum = 0.0
+        self.status_counts: Counter = Counter()
+        self.payment_counts: Counter = Counter()
+        self.item_count = 0
+        self.quantity_sum = 0
+
+    def add_order(self, order: dict):
+        self.order_count += 1
+
+        # Schema only requires these fields to exist, so skip values
+        # that can't be ranged or summed rather than failing the run
+        order_date = order["order_date"]
+        if isinstance(order_date, str):
+            self._add_order_date(order_date)
+        self.total_amount_sum += _as_number(order["total_amount"])
+        self.status_counts[_histogram_key(order["status"])] += 1
+        self.payment_counts[_histogram_key(order["payment_method"])] += 1
+
+    def add_item(self, item: dict):
+        self.item_count += 1
+        self.quantity_sum += _as_number(item["quantity"])
+
+    def merge(self, manifest: dict):
+        """
+        Fold in the statistics of a manifest built by manifest(). Customer
+        and product counts are left to the caller, as they need a global
+        dedupe rather than a sum.
+        """
+        tables = manifest["tables"]
+        orders = tables["orders"]
+        self.order_count += orders["row_count"]
+        for order_date in (orders["order_date_min"], orders["order_date_max"]):
+            if order_date is not None:
+                self._add_order_date(order_date)
+        self.total_amount_sum += orders["total_amount_sum"]
+        self.status_counts.update(orders["status_counts"])
+        self.payment_counts.update(orders["payment_method_counts"])
+        self.item_count += tables["items"]["row_count"]
+        self.quantity_sum += tables["items"]["quantity_sum"]
+
+    def _add_order_date(self, order_date: str):
+        if self.min_order_date is None or order_date < self.min_order_date:
+            self.min_order_date = order_date
+        if self.max_order_date is None or order_date > self.max_order_date:
+            self.max_order_date = order_date
+
+    def manifest(
+        self, customer_count: int, product_count: Optional[int] = None
+    ) -> dict:
+        """
+        Build the statistics manifest. Customer and product counts come
+        from the caller, which owns the deduplication.
+        """
+        stats = {
+            "orders": {
+                "row_count": self.order_count,
+                "order_date_min": self.min_order_date,
+                "order_date_max": self.max_order_date,
+                "total_amount_sum": round(self.total_amount_sum, 2),
+                "distinct_customers": customer_count,
+                "status_counts": dict(self.status_counts),
+                "payment_method_counts": dict(self.payment_counts),
+            },
+            "customers": {
+                "row_count": customer_count,
+            },
+            "items": {
+                "row_count": self.item_count,
+                "quantity_sum": self.quantity_sum,
+            },
+        }
+        if product_count is not None:
+            stats["products"] = {"row_count": product_count}
+
+        return {
+            "tables": {
+                name: {"file": f"{name}.csv", **table} for name, table in stats.items()
+            }
+        }
+
+
+class OrderTransformer:
+    """
+    Incremental form of transform_records: feed decoded orders in batches
+    and get back each batch's new rows per table. Customers are
+    deduplicated and product ids assigned across batches, and statistics
+    accumulate until manifest() is called.
+    """
 
     # Required fields for validation
     required_order_fields = [
@@ -54,96 +232,152 @@ def transform_data(raw_json: str) -> Dict[str, str]:
     required_customer_fields = ["customer_id", "name", "email", "address"]
     required_item_fields = ["product_name", "unit_price", "quantity", "item_total"]
 
-    # -----------------------------
-    # Transform each order
-    # -----------------------------
-    for order in orders:
+    def __init__(self, product_dimension: bool = False):
+        self.product_dimension = product_dimension
+        self.customer_ids: Set = set()
+        self.products_index: Dict[tuple, int] = {}
+        self.stats = OrderStats()
 
-        # Validate order structure
-        for field in required_order_fields:
-            if field not in order:
-                raise SchemaValidationError(
-                    f"Order missing required field '{field}': {order}"
-                )
+    def table_names(self) -> List[str]:
+        """Names of the output tables, in output order."""
+        names = ["orders", "customers", "items"]
+        if self.product_dimension:
+            names.append("products")
+        return names
 
-        customer = order["customer"]
-        items = order["items"]
+    def transform(self, orders: list) -> Dict[str, List[dict]]:
+        """
+        Validate and normalize a batch of orders.
+        Returns {"orders", "customers", "items"} → rows new in this batch.
+        Raises SchemaValidationError on invalid records.
+        """
+        # Storage for normalized tables
+        orders_rows: List[dict] = []
+        customers_rows: List[dict] = []
+        items_rows: List[dict] = []
 
-        # Validate customer structure
-        for field in required_customer_fields:
-            if field not in customer:
-                raise SchemaValidationError(
-                    f"Customer missing required field '{field}': {customer}"
-                )
+        # -----------------------------
+        # Transform each order
+        # -----------------------------
+        for order in orders:
 
-        # Validate items structure
-        if not isinstance(items, list):
-            raise SchemaValidationError("Order 'items' must be a list")
+            # Validate order structure
+            for field in self.required_order_fields:
+                if field not in order:
+                    raise SchemaValidationError(
+                        f"Order missing required field '{field}': {order}"
+                    )
 
-        for item in items:
-            for field in required_item_fields:
-                if field not in item:
+            customer = order["customer"]
+            items = order["items"]
+
+            # Validate customer structure
+            for field in self.required_customer_fields:
+                if field not in customer:
                     raise SchemaValidationError(
-                        f"Order item missing required field '{field}': {item}"
+                        f"Customer missing required field '{field}': {customer}"
                     )
 
-        order_id = order["order_id"]
+            # Validate items structure
+            if not isinstance(items, list):
+                raise SchemaValidationError("Order 'items' must be a list")
 
-        # -----------------------------
-        # 1. ORDERS TABLE
-        # -----------------------------
-        orders_rows.append(
-            {
-                "order_id": order_id,
-                "order_date": order["order_date"],
-                "customer_id": customer["customer_id"],
-                "total_amount": order["total_amount"],
-                "payment_method": order["payment_method"],
-                "status": order["status"],
-            }
-        )
+            for item in items:
+                for field in self.required_item_fields:
+                    if field not in item:
+                        raise SchemaValidationError(
+                            f"Order item missing required field '{field}': {item}"
+                        )
 
-        # -----------------------------
-        # 2. CUSTOMERS TABLE (dedupe)
-        # -----------------------------
-        cust_id = customer["customer_id"]
-        if cust_id not in customers_dict:
-            customers_dict[cust_id] = {
-                "customer_id": cust_id,
-                "name": customer["name"],
-                "email": customer["email"],
-                "address": customer["address"],
-            }
+            order_id = order["order_id"]
 
-        # -----------------------------
-        # 3. ORDER ITEMS TABLE
-        # -----------------------------
-        for item in items:
-            items_rows.append(
+            # -----------------------------
+            # 1. ORDERS TABLE
+            # -----------------------------
+            orders_rows.append(
                 {
                     "order_id": order_id,
-                    "product_name": item["product_name"],
-                    "unit_price": item["unit_price"],
-                    "quantity": item["quantity"],
-                    "item_total": item["item_total"],
+                    "order_date": order["order_date"],
+                    "customer_id": customer["customer_id"],
+                    "total_amount": order["total_amount"],
+                    "payment_method": order["payment_method"],
+                    "status": order["status"],
                 }
             )
+            self.stats.add_order(order)
 
-    # -----------------------------
-    # Convert lists → CSV strings
-    # -----------------------------
-    def to_csv(rows: List[dict]) -> str:
-        if not rows:
-            return ""
+            # -----------------------------
+            # 2. CUSTOMERS TABLE (dedupe)
+            # -----------------------------
+            cust_id = customer["customer_id"]
+            if cust_id not in self.customer_ids:
+                self.customer_ids.add(cust_id)
+                customers_rows.append(
+                    {
+                        "customer_id": cust_id,
+                        "name": customer["name"],
+                        "email": customer["email"],
+                        "address": customer["address"],
+                    }
+                )
 
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
-        return output.getvalue()
-
-    return {
-        "orders": to_csv(orders_rows),
-        "customers": to_csv(list(customers_dict.values())),
-        "items": to_csv(items_rows),
-    }
+            # -----------------------------
+            # 3. ORDER ITEMS TABLE
+            # -----------------------------
+            for item in items:
+                self.stats.add_item(item)
+
+                if not self.product_dimension:
+                    items_rows.append(
+                        {
+                            "order_id": order_id,
+                            "product_name": item["product_name"],
+                            "unit_price": item["unit_price"],
+                            "quantity": item["quantity"],
+                            "item_total": item["item_total"],
+                        }
+                    )
+                    continue
+
+                # 4. PRODUCTS DIMENSION (surrogate id per distinct product)
+                items_rows.append(
+                    {
+                        "order_id": order_id,
+                        "product_id": self.product_id(item),
+                        "quantity": item["quantity"],
+                        "item_total": item["item_total"],
+                    }
+                )
+
+        return {"orders": orders_rows, "customers": customers_rows, "items": items_rows}
+
+    def product_id(self, item: dict) -> int:
+        """
+        Surrogate id of the item's (product_name, unit_price), assigning
+        the next id to a product not seen before.
+        """
+        product_key = (item["product_name"], item["unit_price"])
+        if any(isinstance(value, (list, dict)) for value in product_key):
+            raise SchemaValidationError(
+                f"Order item product_name and unit_price must be scalars: {item}"
+            )
+
+        product_id = self.products_index.get(product_key)
+        if product_id is None:
+            product_id = len(self.products_index) + 1
+            self.products_index[product_key] = product_id
+        return product_id
+
+    def products(self) -> List[dict]:
+        """Rows of the products dimension seen so far."""
+        return [
+            {"product_id": pid, "product_name": name, "unit_price": price}
+            for (name, price), pid in self.products_index.items()
+        ]
+
+    def manifest(self) -> dict:
+        """Statistics manifest for every order transformed so far."""
+        return self.stats.manifest(
+            len(self.customer_ids),
+            len(self.products_index) if self.product_dimension else None,
+        )
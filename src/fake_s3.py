@@ -0,0 +1,141 @@
+"""
+fake_s3.py
+Description: In-process stand-in for the boto3 S3 client, used for local load tests.
+
+Implements just the calls the Lambda makes (get_object, including ranged
+reads, head_object, put_object, delete_objects and multipart uploads) on
+an in-memory store, with configurable per-request latency and bandwidth so
+runs approximate real S3 timings. Downloads pay for bandwidth as the body is
+read, so streamed reads overlap with processing as they would against S3.
+Missing keys raise botocore's ClientError, so s3_utils maps them to
+S3ReadError exactly as it would against AWS.
+"""
+
+# Imports
+# Standard library
+import io  # for file-like response bodies
+import threading  # for a thread-safe store
+import time  # for simulated latency
+
+# External libraries
+from botocore.exceptions import ClientError
+
+
+class _StreamingBody(io.BytesIO):
+    """Response body that simulates the transfer of each read as it happens."""
+
+    def __init__(self, data, client):
+        super().__init__(data)
+        self._client = client
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self._client._simulate_bandwidth(len(data))
+        return data
+
+
+class FakeS3Client:
+    """
+    Minimal thread-safe S3 client replacement.
+
+    Args:
+        latency (float): Fixed seconds added to every request.
+        bandwidth (float, optional): Bytes per second; None means unlimited.
+        objects (dict, optional): Backing store keyed by (bucket, key); pass
+            a multiprocessing.Manager().dict() to share it with worker processes.
+    """
+
+    def __init__(self, latency=0.0, bandwidth=None, objects=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.objects = {} if objects is None else objects
+        self.uploads = {}
+        self.get_count = 0
+        self.put_count = 0
+        self._lock = threading.Lock()
+
+    def _simulate_transfer(self, num_bytes):
+        delay = self.latency
+        if self.bandwidth:
+            delay += num_bytes / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+
+    def _simulate_bandwidth(self, num_bytes):
+        if self.bandwidth and num_bytes:
+            time.sleep(num_bytes / self.bandwidth)
+
+    def _lookup(self, Bucket, Key, operation):
+        with self._lock:
+            body = self.objects.get((Bucket, Key))
+
+        if body is None:
+            self._simulate_transfer(0)
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": f"{Key} not found"}},
+                operation,
+            )
+        return body
+
+    def head_object(self, Bucket, Key):
+        body = self._lookup(Bucket, Key, "HeadObject")
+        self._simulate_transfer(0)
+        return {"ContentLength": len(body)}
+
+    def get_object(self, Bucket, Key, Range=None):
+        with self._lock:
+            self.get_count += 1
+        body = self._lookup(Bucket, Key, "GetObject")
+
+        # Range is inclusive, e.g. "bytes=0-99" for the first 100 bytes
+        if Range is not None:
+            start, end = Range[len("bytes=") :].split("-")
+            body = body[int(start) : int(end) + 1]
+
+        self._simulate_transfer(0)
+        return {"Body": _StreamingBody(body, self), "ContentLength": len(body)}
+
+    def put_object(self, Bucket, Key, Body):
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+
+        self._simulate_transfer(len(Body))
+        with self._lock:
+            self.put_count += 1
+            self.objects[(Bucket, Key)] = Body
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        self._simulate_transfer(0)
+        with self._lock:
+            for entry in Delete["Objects"]:
+                self.objects.pop((Bucket, entry["Key"]), None)
+        return {}
+
+    def create_multipart_upload(self, Bucket, Key):
+        self._simulate_transfer(0)
+        with self._lock:
+            upload_id = f"upload-{len(self.uploads) + 1}"
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._simulate_transfer(len(Body))
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f'"{UploadId}-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._simulate_transfer(0)
+        with self._lock:
+            parts = self.uploads.pop(UploadId)
+            self.put_count += 1
+            self.objects[(Bucket, Key)] = b"".join(
+                parts[part["PartNumber"]] for part in MultipartUpload["Parts"]
+            )
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+        return {}
@@ -0,0 +1,166 @@
+"""
+load_driver.py
+Description: Local end-to-end load driver for the Lambda handler.
+
+Seeds a FakeS3Client with generated order files, swaps it in for the real
+S3 client, then fires synthetic S3 events at index.handler at a target
+rate and concurrency and reports latency percentiles, throughput and
+error rates.
+"""
+
+# Imports
+# Standard library
+import json  # for serializing generated order files
+import math  # for nearest-rank percentiles
+import time  # for scheduling and timing requests
+import uuid  # for synthetic request IDs
+from concurrent.futures import ThreadPoolExecutor  # for concurrent invocations
+from contextlib import contextmanager  # for swapping the S3 client
+from types import SimpleNamespace  # for a minimal Lambda context
+
+# External libraries
+from faker import Faker  # for realistic names, addresses, emails
+from src.generate_data import generate_order
+from lambda_function import config, s3_utils
+from lambda_function.index import handler
+
+fake = Faker()
+
+
+def seed_input_files(
+    client, bucket, num_files, orders_per_file, prefix="input/", fake=fake
+):
+    """
+    Upload generated order files to the fake S3 bucket.
+
+    Args:
+        client (FakeS3Client): Fake S3 client to seed.
+        bucket (str): Input bucket name.
+        num_files (int): Number of order files to create.
+        orders_per_file (int): Orders generated per file.
+        prefix (str, optional): Key prefix for the files.
+        fake (Faker, optional): Faker instance for generating order data.
+
+    Returns:
+        list: The keys that were written.
+    """
+    keys = []
+    for i in range(num_files):
+        key = f"{prefix}orders_{i:04d}.json"
+        orders = [generate_order(fake) for _ in range(orders_per_file)]
+        client.objects[(bucket, key)] = json.dumps(orders).encode("utf-8")
+        keys.append(key)
+    return keys
+
+
+def build_event(bucket, keys):
+    """Build an S3 put event with one record per key."""
+    return {
+        "Records": [
+            {"s3": {"bucket": {"name": bucket}, "object": {"key": key}}} for key in keys
+        ]
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@contextmanager
+def use_fake_s3(client):
+    """Temporarily route the Lambda's S3 calls to the given client."""
+    original = s3_utils.s3
+    s3_utils.s3 = client
+    try:
+        yield client
+    finally:
+        s3_utils.s3 = original
+
+
+def run_load_test(
+    client,
+    bucket,
+    keys,
+    num_requests,
+    rate=None,
+    concurrency=4,
+    records_per_event=1,
+):
+    """
+    Fire synthetic S3 events at index.handler and measure the results.
+
+    Requests are scheduled open-loop at `rate` per second (as fast as
+    possible when None), so latency is measured from each request's
+    scheduled start and includes any time spent queued for a worker.
+
+    Args:
+        client (FakeS3Client): Seeded fake S3 client.
+        bucket (str): Input bucket the keys live in.
+        keys (list): Input keys to cycle through.
+        num_requests (int): Total handler invocations.
+        rate (float, optional): Target invocations per second.
+        concurrency (int, optional): Maximum concurrent invocations.
+        records_per_event (int, optional): S3 records per event; values
+            above 1 need PIPELINE_MODE, as the handler otherwise processes
+            only the first record.
+
+    Returns:
+        dict: Report with latency percentiles (ms), throughput and error rate.
+
+    Raises:
+        ValueError: If records_per_event > 1 without PIPELINE_MODE.
+    """
+    if records_per_event > 1 and not config.PIPELINE_MODE:
+        raise ValueError(
+            "records_per_event > 1 requires PIPELINE_MODE=true; otherwise the "
+            "handler processes only the first record of each event"
+        )
+
+    def invoke(i, scheduled):
+        first = i * records_per_event
+        event_keys = [keys[(first + j) % len(keys)] for j in range(records_per_event)]
+        context = SimpleNamespace(aws_request_id=str(uuid.uuid4()))
+
+        try:
+            response = handler(build_event(bucket, event_keys), context)
+            ok = response["statusCode"] == 200
+        except Exception:
+            ok = False
+        return time.perf_counter() - scheduled, ok
+
+    futures = []
+    with use_fake_s3(client), ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        for i in range(num_requests):
+            scheduled = start + i / rate if rate else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(invoke, i, scheduled))
+
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+
+    return {
+        "requests": num_requests,
+        "errors": errors,
+        "error_rate": errors / num_requests if num_requests else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_rps": num_requests / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None,
+        },
+        "s3_gets": client.get_count,
+        "s3_puts": client.put_count,
+    }
@@ -20,7 +20,9 @@ module "lambda" {
   policy_actions = [
     "s3:GetObject",
     "s3:PutObject",
+    "s3:DeleteObject",
     "s3:ListBucket",
+    "lambda:InvokeFunction",
     "logs:CreateLogGroup",
     "logs:CreateLogStream",
     "logs:PutLogEvents"
@@ -30,12 +32,15 @@ module "lambda" {
     "arn:aws:s3:::${module.ingest_bucket.s3_bucket_name}/*",
     "arn:aws:s3:::${module.ingest_bucket.s3_bucket_name}",
     "arn:aws:s3:::${module.ingest_bucket.s3_bucket_name}/*",
+    "arn:aws:lambda:${data.aws_region.current.id}:${data.aws_caller_identity.current.account_id}:function:${var.function_name}",
     "arn:aws:logs:${data.aws_region.current.id}:${data.aws_caller_identity.current.account_id}:log-group:/aws/lambda/${var.function_name}:*"
   ]
   source_code_hash = data.archive_file.lambda.output_base64sha256
   source_file      = "${path.root}/../lambda/index.py"
   output_path      = "${path.module}/lambda.zip"
-  timeout          = 10
+  # Fan-out coordinators wait on their shard workers and then merge, and
+  # each worker may run up to its own limit: allow the Lambda maximum
+  timeout          = 900
   tags = {
     module = "lambda"
   }
@@ -0,0 +1,115 @@
+import pytest
+from lambda_function import decoder
+from lambda_function.decoder import (
+    decode_json,
+    decode_lines,
+    decode_records,
+    get_decoder,
+    RecordStream,
+)
+from lambda_function.errors import SchemaValidationError
+from lambda_function.errors import ConfigurationError, TransformError
+
+
+@pytest.mark.parametrize("backend", list(decoder.BACKENDS))
+def test_decode_json_valid(backend):
+    result = decode_json('[{"order_id": "123", "total_amount": 20.5}]', backend)
+    assert result == [{"order_id": "123", "total_amount": 20.5}]
+
+
+@pytest.mark.parametrize("backend", list(decoder.BACKENDS))
+def test_decode_json_invalid_raises_transform_error(backend):
+    with pytest.raises(TransformError):
+        decode_json("not valid json", backend)
+
+
+def test_auto_prefers_first_registered_backend():
+    assert get_decoder("auto") is next(iter(decoder.BACKENDS.values()))
+
+
+def test_stdlib_backend_always_available():
+    assert get_decoder("json") is decoder._stdlib_loads
+
+
+@pytest.mark.parametrize("backend", list(decoder.BACKENDS))
+def test_backends_accept_what_stdlib_accepts(backend):
+    result = decode_json(
+        '[{"total_amount": NaN, "big": 123456789012345678901234}]', backend
+    )
+    assert result[0]["big"] == 123456789012345678901234
+    assert result[0]["total_amount"] != result[0]["total_amount"]  # NaN
+
+
+def test_unknown_backend_raises_configuration_error():
+    with pytest.raises(ConfigurationError):
+        get_decoder("does-not-exist")
+
+
+def test_decode_records_json_array():
+    assert decode_records('[{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+
+
+def test_decode_records_json_lines():
+    assert decode_records('{"a": 1}\n\n{"a": 2}\n') == [{"a": 1}, {"a": 2}]
+
+
+def test_decode_records_lone_object_is_not_a_list():
+    assert decode_records('{\n  "a": 1\n}') == {"a": 1}
+    assert decode_records('{"a": 1}\n') == {"a": 1}
+
+
+def test_decode_records_json_lines_error_names_line():
+    with pytest.raises(TransformError, match="line 2"):
+        decode_records('{"a": 1}\n{"a": \n')
+
+
+def test_decode_lines_blank_input_is_empty():
+    assert decode_lines("\n \n\n") == []
+
+
+def test_decode_lines_numbers_lines_from_first_line():
+    with pytest.raises(TransformError, match="line 11"):
+        decode_lines('{"a": 1}\n{"a": \n', first_line=10)
+
+
+def stream_records(raw, chunk_size):
+    stream = RecordStream()
+    records = []
+    for i in range(0, len(raw), chunk_size):
+        records.extend(stream.feed(raw[i : i + chunk_size]))
+    return records + stream.close()
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '[{"a": 1}, {"a": [1, "x]"]}, 12, 3.5e2, -Infinity, null]',
+        '\n[\n  {"a": 1},\n  {"a": 2}\n]\n',
+        " [ ] ",
+        '{"a": 1}\n\n{"a": 2}\n',
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_record_stream_matches_decode_records(raw, chunk_size):
+    assert repr(stream_records(raw, chunk_size)) == repr(decode_records(raw))
+
+
+def test_record_stream_decodes_array_elements_as_they_complete():
+    stream = RecordStream()
+    assert stream.feed('[{"a": 1}, {"a"') == [{"a": 1}]
+    assert stream.feed(": 2}, 1") == [{"a": 2}]
+    assert stream.feed("5]") == [15]
+    assert stream.close() == []
+
+
+@pytest.mark.parametrize("raw", ["", "  ", "[1,]", "[1 2]", "[1]x", "[1", "{"])
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+def test_record_stream_rejects_invalid_json(raw, chunk_size):
+    with pytest.raises(TransformError):
+        stream_records(raw, chunk_size)
+
+
+@pytest.mark.parametrize("raw", ['{"a": 1}\n', "42"])
+def test_record_stream_rejects_non_list_like_decode_records(raw):
+    with pytest.raises(SchemaValidationError):
+        stream_records(raw, 2)
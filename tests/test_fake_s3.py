@@ -0,0 +1,41 @@
+import time
+import pytest
+from botocore.exceptions import ClientError
+from src.fake_s3 import FakeS3Client
+
+
+def test_put_then_get_roundtrip():
+    client = FakeS3Client()
+    client.put_object(Bucket="b", Key="k", Body="hello".encode("utf-8"))
+
+    response = client.get_object(Bucket="b", Key="k")
+    assert response["Body"].read() == b"hello"
+    assert client.put_count == 1
+    assert client.get_count == 1
+
+
+def test_get_missing_key_raises_client_error():
+    client = FakeS3Client()
+
+    with pytest.raises(ClientError):
+        client.get_object(Bucket="b", Key="missing")
+
+
+def test_latency_and_bandwidth_are_simulated():
+    client = FakeS3Client(latency=0.02, bandwidth=10_000)
+
+    start = time.perf_counter()
+    client.put_object(Bucket="b", Key="k", Body=b"x" * 500)  # 0.02s + 0.05s
+    assert time.perf_counter() - start >= 0.07
+
+
+def test_download_bandwidth_is_paid_as_the_body_is_read():
+    client = FakeS3Client(bandwidth=10_000)
+    client.put_object(Bucket="b", Key="k", Body=b"x" * 1000)
+
+    start = time.perf_counter()
+    body = client.get_object(Bucket="b", Key="k")["Body"]
+    assert time.perf_counter() - start < 0.05
+
+    assert body.read(500) == b"x" * 500  # 0.05s
+    assert time.perf_counter() - start >= 0.05
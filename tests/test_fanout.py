@@ -0,0 +1,219 @@
+import json
+import multiprocessing
+import pytest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+
+from lambda_function import config
+from lambda_function.fanout import plan_shards, run_fanout
+from lambda_function.transform import transform_with_stats
+from lambda_function.errors import SchemaValidationError
+from src.fake_s3 import FakeS3Client
+
+
+def make_order(i, customer_id):
+    return {
+        "order_id": f"O{i}",
+        "order_date": f"2024-01-{i % 28 + 1:02d}",
+        "customer": {
+            "customer_id": customer_id,
+            "name": f"Customer {customer_id}",
+            "email": f"{customer_id}@example.com",
+            "address": "1 Main St",
+        },
+        "items": [
+            {
+                "product_name": ["Widget", "Gadget", "Gizmo"][i % 3],
+                "unit_price": [10.0, 5.5, 2.25][i % 3],
+                "quantity": i % 4 + 1,
+                "item_total": round([10.0, 5.5, 2.25][i % 3] * (i % 4 + 1), 2),
+            }
+        ],
+        "total_amount": round([10.0, 5.5, 2.25][i % 3] * (i % 4 + 1), 2),
+        "payment_method": ["card", "paypal"][i % 2],
+        "status": ["shipped", "pending", "delivered"][i % 3],
+    }
+
+
+# Customers repeat across the whole file, so they span shards
+ORDERS = [make_order(i, f"C{i % 7}") for i in range(40)]
+NDJSON = "\n".join(json.dumps(order) for order in ORDERS) + "\n"
+
+SHARD_MANIFEST_KEY = (
+    config.OUTPUT_BUCKET,
+    f"{config.PROCESSED_PREFIX}_shards/input-bucket/input/big.jsonl/"
+    f"{config.SHARD_MANIFEST_FILENAME}",
+)
+
+
+def processed(fake_s3, filename):
+    return fake_s3.objects[
+        (config.OUTPUT_BUCKET, f"{config.PROCESSED_PREFIX}{filename}")
+    ]
+
+
+@pytest.fixture
+def fake_s3():
+    client = FakeS3Client()
+    client.objects[("input-bucket", "input/big.jsonl")] = NDJSON.encode("utf-8")
+    with patch("lambda_function.s3_utils.s3", client):
+        yield client
+
+
+def test_plan_shards_cut_at_record_boundaries(fake_s3):
+    shards = plan_shards("input-bucket", "input/big.jsonl", 500)
+    data = NDJSON.encode("utf-8")
+
+    assert len(shards) > 1
+    assert shards[0][0] == 0 and shards[-1][1] == len(data)
+    for (_, end), (next_start, _) in zip(shards, shards[1:]):
+        assert end == next_start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_plan_shards_json_array_is_single_shard(fake_s3):
+    fake_s3.objects[("input-bucket", "input/orders.json")] = json.dumps(ORDERS).encode(
+        "utf-8"
+    )
+
+    assert plan_shards("input-bucket", "input/orders.json", 500) == [
+        (0, len(fake_s3.objects[("input-bucket", "input/orders.json")]))
+    ]
+
+
+@pytest.mark.parametrize("product_dimension", [False, True])
+def test_fanout_matches_single_pass(fake_s3, product_dimension):
+    expected_tables, expected_manifest = transform_with_stats(
+        json.dumps(ORDERS), product_dimension
+    )
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        keys = run_fanout(
+            "input-bucket",
+            "input/big.jsonl",
+            product_dimension=product_dimension,
+            shard_bytes=700,
+            executor=executor,
+        )
+
+    assert keys[-1] == f"{config.PROCESSED_PREFIX}{config.MANIFEST_FILENAME}"
+    for name, csv_data in expected_tables.items():
+        assert processed(fake_s3, f"{name}.csv").decode("utf-8") == csv_data
+
+    manifest = json.loads(processed(fake_s3, config.MANIFEST_FILENAME))
+    assert manifest == expected_manifest
+
+
+def test_fanout_streams_merged_tables_as_multipart(fake_s3):
+    expected_tables, _ = transform_with_stats(json.dumps(ORDERS))
+
+    with patch.object(config, "MULTIPART_PART_BYTES", 256), ThreadPoolExecutor(
+        max_workers=2
+    ) as executor:
+        run_fanout(
+            "input-bucket", "input/big.jsonl", shard_bytes=700, executor=executor
+        )
+
+    assert fake_s3.uploads == {}  # every multipart upload was completed
+    assert processed(fake_s3, "items.csv").decode("utf-8") == expected_tables["items"]
+
+
+def test_fanout_with_process_pool():
+    context = multiprocessing.get_context("fork")
+    with context.Manager() as manager:
+        client = FakeS3Client(objects=manager.dict())
+        client.objects[("input-bucket", "input/big.jsonl")] = NDJSON.encode("utf-8")
+
+        with patch("lambda_function.s3_utils.s3", client), ProcessPoolExecutor(
+            max_workers=2, mp_context=context
+        ) as executor:
+            run_fanout(
+                "input-bucket", "input/big.jsonl", shard_bytes=700, executor=executor
+            )
+
+        shard_manifest = json.loads(client.objects[SHARD_MANIFEST_KEY])
+        customers_csv = processed(client, "customers.csv").decode("utf-8")
+
+    assert len(shard_manifest["shards"]) > 1
+    assert all(s["status"] == "complete" for s in shard_manifest["shards"])
+    assert len(customers_csv.splitlines()) == 1 + 7
+
+
+
+def test_fanout_blank_only_shard(fake_s3):
+    data = "\n".join(json.dumps(order) for order in ORDERS[:3]) + "\n" * 50
+    fake_s3.objects[("input-bucket", "input/big.jsonl")] = data.encode("utf-8")
+    shard_bytes = len(data) - 40
+
+    shards = plan_shards("input-bucket", "input/big.jsonl", shard_bytes)
+    assert len(shards) == 2
+    assert data[shards[1][0] :].strip() == ""
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        run_fanout(
+            "input-bucket", "input/big.jsonl", shard_bytes=shard_bytes, executor=executor
+        )
+
+    expected_tables, _ = transform_with_stats(data)
+    for name, csv_data in expected_tables.items():
+        assert processed(fake_s3, f"{name}.csv").decode("utf-8") == csv_data
+
+def test_fanout_same_named_inputs_keep_separate_shards(fake_s3):
+    fake_s3.objects[("input-bucket", "day1/big.jsonl")] = NDJSON.encode("utf-8")
+    fake_s3.objects[("input-bucket", "day2/big.jsonl")] = NDJSON.encode("utf-8")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        run_fanout("input-bucket", "day1/big.jsonl", shard_bytes=700, executor=executor)
+        run_fanout("input-bucket", "day2/big.jsonl", shard_bytes=700, executor=executor)
+
+    shard_manifests = [
+        key
+        for _, key in fake_s3.objects
+        if key.endswith(config.SHARD_MANIFEST_FILENAME)
+    ]
+    assert len(shard_manifests) == 2
+
+
+def test_fanout_shard_failure_recorded_and_raised(fake_s3):
+    bad = NDJSON + json.dumps({"order_id": "broken"}) + "\n"
+    fake_s3.objects[("input-bucket", "input/big.jsonl")] = bad.encode("utf-8")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(SchemaValidationError):
+            run_fanout(
+                "input-bucket", "input/big.jsonl", shard_bytes=700, executor=executor
+            )
+
+    statuses = [
+        s["status"] for s in json.loads(fake_s3.objects[SHARD_MANIFEST_KEY])["shards"]
+    ]
+    assert statuses[-1] == "failed"
+    assert "pending" not in statuses
+
+
+def shard_objects(fake_s3):
+    return [
+        key
+        for _, key in fake_s3.objects
+        if key.startswith(f"{config.PROCESSED_PREFIX}_shards/")
+    ]
+
+
+def test_fanout_deletes_shard_tables_after_merge(fake_s3):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        run_fanout("input-bucket", "input/big.jsonl", shard_bytes=700, executor=executor)
+
+    assert shard_objects(fake_s3) == [SHARD_MANIFEST_KEY[1]]
+
+
+def test_fanout_deletes_shard_tables_after_failure(fake_s3):
+    bad = NDJSON + json.dumps({"order_id": "broken"}) + "\n"
+    fake_s3.objects[("input-bucket", "input/big.jsonl")] = bad.encode("utf-8")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(SchemaValidationError):
+            run_fanout(
+                "input-bucket", "input/big.jsonl", shard_bytes=700, executor=executor
+            )
+
+    assert shard_objects(fake_s3) == [SHARD_MANIFEST_KEY[1]]
@@ -1,9 +1,13 @@
+import io
 import json
+from types import SimpleNamespace
 import pytest
 from unittest.mock import patch, MagicMock
 
 from lambda_function.index import handler
 from lambda_function.errors import InvalidEventError
+from lambda_function import config
+from src.fake_s3 import FakeS3Client
 
 
 def test_handler_success():
@@ -18,19 +22,25 @@ def test_handler_success():
         ]
     }
 
-    with patch("lambda.index.read_from_s3", return_value="raw") as mock_read, patch(
-        "lambda.index.transform_data",
-        return_value={"orders": "csv1", "customers": "csv2", "items": "csv3"},
+    with patch(
+        "lambda_function.index.read_from_s3", return_value="raw"
+    ) as mock_read, patch(
+        "lambda_function.index.transform_with_stats",
+        return_value=(
+            {"orders": "csv1", "customers": "csv2", "items": "csv3"},
+            {"tables": {}},
+        ),
     ) as mock_transform, patch(
-        "lambda.index.write_processed_file", return_value="processed/orders.csv"
+        "lambda_function.index.write_processed_file",
+        return_value="processed/orders.csv",
     ) as mock_write:
 
-        response = handler(event, None)
+        response = handler(event, make_context())
         body = json.loads(response["body"])
 
         assert response["statusCode"] == 200
         assert "processed_files" in body
-        assert len(body["processed_files"]) == 3
+        assert len(body["processed_files"]) == 4
 
 
 def test_handler_invalid_event():
@@ -41,3 +51,233 @@ def test_handler_invalid_event():
 
     assert response["statusCode"] == 400
     assert "error" in body
+
+
+RAW_ORDERS = json.dumps(
+    [
+        {
+            "order_id": "123",
+            "order_date": "2024-01-01",
+            "customer": {
+                "customer_id": "C1",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St",
+            },
+            "items": [
+                {
+                    "product_name": "Widget",
+                    "unit_price": 10.0,
+                    "quantity": 2,
+                    "item_total": 20.0,
+                }
+            ],
+            "total_amount": 20.0,
+            "payment_method": "card",
+            "status": "completed",
+        }
+    ]
+)
+
+
+def make_event(*keys):
+    return {
+        "Records": [
+            {"s3": {"bucket": {"name": "input-bucket"}, "object": {"key": key}}}
+            for key in keys
+        ]
+    }
+
+
+def make_context():
+    return SimpleNamespace(aws_request_id="test-request")
+
+
+def test_handler_writes_manifest_after_tables():
+    written = {}
+
+    def fake_write(data, filename):
+        written[filename] = data
+        return f"processed/{filename}"
+
+    with patch("lambda_function.index.read_from_s3", return_value=RAW_ORDERS), patch(
+        "lambda_function.index.write_processed_file", side_effect=fake_write
+    ):
+        response = handler(make_event("input/orders.json"), make_context())
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 200
+    assert body["processed_files"] == [
+        "processed/orders.csv",
+        "processed/customers.csv",
+        "processed/items.csv",
+        "processed/manifest.json",
+    ]
+    assert list(written)[-1] == "manifest.json"
+
+    manifest = json.loads(written["manifest.json"])
+    assert set(manifest["tables"]) == {"orders", "customers", "items"}
+    assert manifest["tables"]["orders"]["total_amount_sum"] == 20.0
+
+
+def test_handler_transform_error_returns_500():
+    with patch(
+        "lambda_function.index.read_from_s3", return_value="not valid json"
+    ), patch("lambda_function.index.write_processed_file") as mock_write:
+        response = handler(make_event("input/orders.json"), make_context())
+
+    assert response["statusCode"] == 500
+    mock_write.assert_not_called()
+
+
+def test_handler_pipeline_mode_processes_every_record():
+    fake_s3 = FakeS3Client()
+    for key in ("day1/orders.json", "day2/orders.json"):
+        fake_s3.objects[("input-bucket", key)] = RAW_ORDERS.encode("utf-8")
+
+    with patch.object(config, "PIPELINE_MODE", True), patch(
+        "lambda_function.s3_utils.s3", fake_s3
+    ):
+        response = handler(
+            make_event("day1/orders.json", "day2/orders.json"), make_context()
+        )
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 200
+    assert fake_s3.get_count == 2
+    assert len(body["processed_files"]) == len(set(body["processed_files"])) == 8
+
+
+def test_handler_pipeline_mode_bad_config_returns_500():
+    fake_s3 = FakeS3Client()
+    with patch.object(config, "PIPELINE_MODE", True), patch.object(
+        config, "PIPELINE_READ_WORKERS", 0
+    ), patch("lambda_function.s3_utils.s3", fake_s3):
+        response = handler(make_event("input/orders.json"), make_context())
+
+    assert response["statusCode"] == 500
+    assert fake_s3.get_count == 0
+
+
+class FakeLambdaClient:
+    """Runs each worker invocation through the handler in-process."""
+
+    def __init__(self):
+        self.invocations = 0
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.invocations += 1
+        response = handler(json.loads(Payload), make_context())
+        return {
+            "StatusCode": 200,
+            "Payload": io.BytesIO(json.dumps(response).encode("utf-8")),
+        }
+
+
+def run_fanout_handler(fake_s3, key, fake_lambda):
+    with patch("lambda_function.s3_utils.s3", fake_s3), patch(
+        "lambda_function.fanout._lambda_client", return_value=fake_lambda
+    ), patch.object(config, "FANOUT_THRESHOLD_BYTES", 100), patch.object(
+        config, "FANOUT_SHARD_BYTES", 200
+    ), patch.object(
+        config, "FANOUT_WORKER_FUNCTION", "pipeline-worker"
+    ):
+        return handler(make_event(key), make_context())
+
+
+def test_handler_fans_out_large_json_lines_to_worker_invocations():
+    orders = json.loads(RAW_ORDERS) * 5
+    for i, order in enumerate(orders):
+        order["order_id"] = str(i)
+    fake_s3 = FakeS3Client()
+    fake_s3.objects[("input-bucket", "input/big.jsonl")] = "".join(
+        json.dumps(order) + "\n" for order in orders
+    ).encode("utf-8")
+    fake_lambda = FakeLambdaClient()
+
+    response = run_fanout_handler(fake_s3, "input/big.jsonl", fake_lambda)
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 200
+    assert fake_lambda.invocations > 1
+    assert body["processed_files"][-1] == "processed/manifest.json"
+
+    manifest = json.loads(
+        fake_s3.objects[(config.OUTPUT_BUCKET, "processed/manifest.json")]
+    )
+    assert manifest["tables"]["orders"]["row_count"] == 5
+    assert manifest["tables"]["customers"]["row_count"] == 1
+
+
+def test_handler_fan_out_worker_error_keeps_its_type():
+    bad = RAW_ORDERS[1:-1] + "\n" + json.dumps({"order_id": "broken"}) + "\n"
+    fake_s3 = FakeS3Client()
+    fake_s3.objects[("input-bucket", "input/big.jsonl")] = (bad * 3).encode("utf-8")
+
+    response = run_fanout_handler(fake_s3, "input/big.jsonl", FakeLambdaClient())
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 500
+    assert body["error_type"] == "SchemaValidationError"
+
+
+def test_handler_fan_out_negative_max_workers_returns_500():
+    fake_s3 = FakeS3Client()
+    fake_s3.objects[("input-bucket", "input/big.jsonl")] = (
+        (RAW_ORDERS[1:-1] + "\n") * 5
+    ).encode("utf-8")
+    fake_lambda = FakeLambdaClient()
+
+    with patch.object(config, "FANOUT_MAX_WORKERS", -1):
+        response = run_fanout_handler(fake_s3, "input/big.jsonl", fake_lambda)
+
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"])["error_type"] == "ConfigurationError"
+    assert fake_lambda.invocations == 0
+
+
+def test_handler_single_shard_input_skips_fan_out():
+    orders = json.loads(RAW_ORDERS) * 5
+    fake_s3 = FakeS3Client()
+    fake_s3.objects[("input-bucket", "input/big.json")] = json.dumps(
+        orders, indent=2
+    ).encode("utf-8")
+    fake_lambda = FakeLambdaClient()
+
+    response = run_fanout_handler(fake_s3, "input/big.json", fake_lambda)
+
+    assert response["statusCode"] == 200
+    assert fake_lambda.invocations == 0
+    assert not any("_shards/" in key for _, key in fake_s3.objects)
+    manifest = json.loads(
+        fake_s3.objects[(config.OUTPUT_BUCKET, "processed/manifest.json")]
+    )
+    assert manifest["tables"]["orders"]["row_count"] == 5
+
+
+def test_handler_accepts_small_json_lines_without_fan_out():
+    written = {}
+
+    def fake_write(data, filename):
+        written[filename] = data
+        return f"processed/{filename}"
+
+    json_lines = (RAW_ORDERS[1:-1] + "\n") * 2
+    with patch("lambda_function.index.read_from_s3", return_value=json_lines), patch(
+        "lambda_function.index.write_processed_file", side_effect=fake_write
+    ):
+        response = handler(make_event("input/small.jsonl"), make_context())
+
+    assert response["statusCode"] == 200
+    assert json.loads(written["manifest.json"])["tables"]["orders"]["row_count"] == 2
+
+
+def test_handler_rejects_lone_top_level_object():
+    with patch(
+        "lambda_function.index.read_from_s3", return_value=RAW_ORDERS[1:-1]
+    ), patch("lambda_function.index.write_processed_file") as mock_write:
+        response = handler(make_event("input/order.json"), make_context())
+
+    assert response["statusCode"] == 500
+    assert json.loads(response["body"])["error_type"] == "SchemaValidationError"
+    mock_write.assert_not_called()
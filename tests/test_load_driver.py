@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import patch
+from faker import Faker
+from src.fake_s3 import FakeS3Client
+from lambda_function import config
+from src.load_driver import percentile, run_load_test, seed_input_files
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) is None
+
+
+def test_load_test_reports_success():
+    fake = Faker()
+    fake.seed_instance(0)
+    client = FakeS3Client()
+    keys = seed_input_files(client, "input-bucket", 2, 5, fake=fake)
+
+    report = run_load_test(client, "input-bucket", keys, num_requests=6, concurrency=2)
+
+    assert report["requests"] == 6
+    assert report["errors"] == 0
+    assert report["s3_gets"] == 6
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+
+def test_load_test_counts_errors():
+    client = FakeS3Client()
+
+    report = run_load_test(
+        client, "input-bucket", ["input/missing.json"], num_requests=3, concurrency=1
+    )
+
+    assert report["errors"] == 3
+    assert report["error_rate"] == 1.0
+
+
+def test_multi_record_events_require_pipeline_mode():
+    client = FakeS3Client()
+
+    with patch.object(config, "PIPELINE_MODE", False):
+        with pytest.raises(ValueError):
+            run_load_test(client, "input-bucket", ["k"], 1, records_per_event=2)
+
+    assert client.get_count == 0
+
+
+def test_multi_record_events_with_pipeline_mode():
+    fake = Faker()
+    fake.seed_instance(0)
+    client = FakeS3Client()
+    keys = seed_input_files(client, "input-bucket", 4, 3, fake=fake)
+
+    with patch.object(config, "PIPELINE_MODE", True):
+        report = run_load_test(
+            client, "input-bucket", keys, num_requests=2, records_per_event=2
+        )
+
+    assert report["errors"] == 0
+    assert report["s3_gets"] == 4
@@ -0,0 +1,205 @@
+import io
+import json
+import threading
+import pytest
+from unittest.mock import patch
+
+from lambda_function import config
+from lambda_function.pipeline import run_pipeline
+from lambda_function.transform import transform_with_stats
+from lambda_function.errors import (
+    ConfigurationError,
+    S3ReadError,
+    S3WriteError,
+    SchemaValidationError,
+)
+from src.fake_s3 import FakeS3Client
+
+
+def make_order(i):
+    return {
+        "order_id": f"O{i}",
+        "order_date": f"2024-01-{i % 28 + 1:02d}",
+        "customer": {
+            "customer_id": f"C{i % 7}",
+            "name": f"Customer {i % 7}",
+            "email": f"c{i % 7}@example.com",
+            "address": "1 Main St",
+        },
+        "items": [
+            {
+                "product_name": ["Widget", "Gadget", "Gizmo"][i % 3],
+                "unit_price": [10.0, 5.5, 2.25][i % 3],
+                "quantity": i % 4 + 1,
+                "item_total": round([10.0, 5.5, 2.25][i % 3] * (i % 4 + 1), 2),
+            }
+        ],
+        "total_amount": round([10.0, 5.5, 2.25][i % 3] * (i % 4 + 1), 2),
+        "payment_method": ["card", "paypal"][i % 2],
+        "status": ["shipped", "pending", "delivered"][i % 3],
+    }
+
+
+ORDERS = [make_order(i) for i in range(40)]
+RAW_ORDERS = json.dumps(ORDERS, indent=2)
+JSON_LINES = "".join(json.dumps(order) + "\n" for order in ORDERS)
+
+
+def processed(fake_s3, filename):
+    return fake_s3.objects[
+        (config.OUTPUT_BUCKET, f"{config.PROCESSED_PREFIX}{filename}")
+    ].decode("utf-8")
+
+
+@pytest.fixture
+def fake_s3():
+    client = FakeS3Client()
+    client.objects[("input-bucket", "input/orders.json")] = RAW_ORDERS.encode("utf-8")
+    # Small parts so tables are uploaded as several multipart parts
+    with patch("lambda_function.s3_utils.s3", client), patch.object(
+        config, "MULTIPART_PART_BYTES", 256
+    ):
+        yield client
+
+
+@pytest.mark.parametrize("raw", [RAW_ORDERS, JSON_LINES], ids=["array", "lines"])
+@pytest.mark.parametrize("product_dimension", [False, True])
+def test_pipeline_streamed_output_matches_single_pass(fake_s3, raw, product_dimension):
+    fake_s3.objects[("input-bucket", "input/orders.json")] = raw.encode("utf-8")
+
+    keys = run_pipeline(
+        [("input-bucket", "input/orders.json")],
+        product_dimension=product_dimension,
+        chunk_bytes=100,
+    )
+
+    expected_tables, expected_manifest = transform_with_stats(raw, product_dimension)
+    assert keys == [
+        f"{config.PROCESSED_PREFIX}{name}.csv" for name in expected_tables
+    ] + [f"{config.PROCESSED_PREFIX}{config.MANIFEST_FILENAME}"]
+    for name, csv_data in expected_tables.items():
+        assert processed(fake_s3, f"{name}.csv") == csv_data
+    assert json.loads(processed(fake_s3, config.MANIFEST_FILENAME)) == (
+        expected_manifest
+    )
+
+
+def test_pipeline_uploads_while_the_object_is_still_downloading(fake_s3):
+    part_uploaded = threading.Event()
+
+    class GatedBody(io.BytesIO):
+        """Withholds the last bytes of the object until a part is uploaded."""
+
+        def read(self, size=-1):
+            if self.tell() + size >= len(self.getvalue()):
+                assert part_uploaded.wait(timeout=5), "no upload during the read"
+            return super().read(size)
+
+    get_object = fake_s3.get_object
+    upload_part = fake_s3.upload_part
+
+    def gated_get_object(**kwargs):
+        response = get_object(**kwargs)
+        response["Body"] = GatedBody(response["Body"].read())
+        return response
+
+    def recording_upload_part(**kwargs):
+        part_uploaded.set()
+        return upload_part(**kwargs)
+
+    with patch.object(fake_s3, "get_object", gated_get_object), patch.object(
+        fake_s3, "upload_part", recording_upload_part
+    ):
+        run_pipeline([("input-bucket", "input/orders.json")], chunk_bytes=100)
+
+    assert part_uploaded.is_set()
+
+
+def test_pipeline_multiple_sources_namespaced_and_ordered(fake_s3):
+    sources = [("input-bucket", f"input/batch{i}.json") for i in range(5)]
+    for bucket, key in sources:
+        fake_s3.objects[(bucket, key)] = RAW_ORDERS.encode("utf-8")
+
+    keys = run_pipeline(sources, queue_size=1, read_workers=2, write_workers=3)
+
+    assert len(keys) == 5 * 4
+    assert keys[:4] == [
+        "processed/input-bucket/input/batch0.json/orders.csv",
+        "processed/input-bucket/input/batch0.json/customers.csv",
+        "processed/input-bucket/input/batch0.json/items.csv",
+        "processed/input-bucket/input/batch0.json/manifest.json",
+    ]
+    assert keys[-1] == "processed/input-bucket/input/batch4.json/manifest.json"
+
+
+def test_pipeline_same_named_sources_do_not_collide(fake_s3):
+    sources = [
+        ("input-bucket", "day1/orders.json"),
+        ("input-bucket", "day2/orders.json"),
+    ]
+    for bucket, key in sources:
+        fake_s3.objects[(bucket, key)] = RAW_ORDERS.encode("utf-8")
+
+    keys = run_pipeline(sources)
+
+    assert len(keys) == len(set(keys)) == 8
+
+
+@pytest.mark.parametrize(
+    "setting", ["queue_size", "read_workers", "write_workers", "chunk_bytes"]
+)
+def test_pipeline_rejects_non_positive_settings(fake_s3, setting):
+    with pytest.raises(ConfigurationError):
+        run_pipeline([("input-bucket", "input/orders.json")], **{setting: 0})
+
+    assert fake_s3.get_count == 0
+
+
+def test_pipeline_manifest_written_after_its_tables(fake_s3):
+    written = []
+    put_object = fake_s3.put_object
+    complete = fake_s3.complete_multipart_upload
+
+    def recording_put_object(**kwargs):
+        written.append(kwargs["Key"])
+        return put_object(**kwargs)
+
+    def recording_complete(**kwargs):
+        written.append(kwargs["Key"])
+        return complete(**kwargs)
+
+    with patch.object(fake_s3, "put_object", recording_put_object), patch.object(
+        fake_s3, "complete_multipart_upload", recording_complete
+    ):
+        run_pipeline([("input-bucket", "input/orders.json")], write_workers=4)
+
+    assert len(written) == 4
+    assert written[-1] == f"{config.PROCESSED_PREFIX}{config.MANIFEST_FILENAME}"
+
+
+def test_pipeline_read_error_propagates(fake_s3):
+    with pytest.raises(S3ReadError):
+        run_pipeline([("input-bucket", "input/missing.json")])
+
+
+def test_pipeline_schema_error_aborts_uploads(fake_s3):
+    bad = JSON_LINES + json.dumps({"order_id": "broken"}) + "\n"
+    fake_s3.objects[("input-bucket", "input/orders.json")] = bad.encode("utf-8")
+
+    with pytest.raises(SchemaValidationError):
+        run_pipeline([("input-bucket", "input/orders.json")], chunk_bytes=100)
+
+    assert fake_s3.uploads == {}
+    assert not any(
+        key.startswith(config.PROCESSED_PREFIX) for _, key in fake_s3.objects
+    )
+
+
+def test_pipeline_unexpected_write_error_wrapped(fake_s3):
+    sources = [("input-bucket", f"orders{i}.json") for i in range(10)]
+    for bucket, key in sources:
+        fake_s3.objects[(bucket, key)] = RAW_ORDERS.encode("utf-8")
+
+    with patch.object(fake_s3, "upload_part", side_effect=RuntimeError("boom")):
+        with pytest.raises(S3WriteError):
+            run_pipeline(sources)
@@ -1,7 +1,14 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from lambda_function.s3_utils import read_from_s3, write_processed_file
+from lambda_function import config
+from lambda_function.s3_utils import (
+    read_from_s3,
+    stream_from_s3,
+    write_processed_file,
+    write_processed_stream,
+)
 from lambda_function.errors import S3ReadError, S3WriteError
+from src.fake_s3 import FakeS3Client
 
 
 @patch("lambda.s3_utils.s3")
@@ -34,3 +41,45 @@ def test_write_processed_file_failure(mock_s3):
 
     with pytest.raises(S3WriteError):
         write_processed_file("csv,data", "orders.csv")
+
+
+def test_write_processed_stream_multipart():
+    client = FakeS3Client()
+    chunks = ["header\n"] + [f"row-{i}\n" for i in range(100)]
+
+    with patch("lambda_function.s3_utils.s3", client), patch.object(
+        config, "MULTIPART_PART_BYTES", 64
+    ):
+        key = write_processed_stream(iter(chunks), "orders.csv")
+
+    assert client.objects[(config.OUTPUT_BUCKET, key)] == "".join(chunks).encode()
+    assert client.uploads == {}
+
+
+def test_write_processed_stream_small_output_single_put():
+    client = FakeS3Client()
+
+    with patch("lambda_function.s3_utils.s3", client):
+        key = write_processed_stream(iter(["a,b\n", "1,2\n"]), "orders.csv")
+
+    assert client.objects[(config.OUTPUT_BUCKET, key)] == b"a,b\n1,2\n"
+    assert client.put_count == 1
+
+
+def test_stream_from_s3_keeps_multibyte_characters_whole():
+    client = FakeS3Client()
+    text = "Zoë Ångström ☃\n" * 10
+    client.objects[("input-bucket", "orders.json")] = text.encode("utf-8")
+
+    with patch("lambda_function.s3_utils.s3", client):
+        chunks = list(stream_from_s3("input-bucket", "orders.json", 3))
+
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    assert client.get_count == 1
+
+
+def test_stream_from_s3_missing_key_raises_read_error():
+    with patch("lambda_function.s3_utils.s3", FakeS3Client()):
+        with pytest.raises(S3ReadError):
+            list(stream_from_s3("input-bucket", "missing.json", 1024))
@@ -1,5 +1,11 @@
+import json
 import pytest
-from lambda_function.transform import transform_data
+from lambda_function.transform import (
+    OrderStats,
+    transform_data,
+    transform_records,
+    transform_with_stats,
+)
 from lambda_function.errors import TransformError, SchemaValidationError
 
 
@@ -56,3 +62,245 @@ def test_transform_missing_field():
     """
     with pytest.raises(SchemaValidationError):
         transform_data(raw_json)
+
+
+def test_transform_product_dimension():
+    raw_json = """
+    [
+        {
+            "order_id": "123",
+            "order_date": "2024-01-01",
+            "customer": {
+                "customer_id": "C1",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St"
+            },
+            "items": [
+                {"product_name": "Widget", "unit_price": 10.0, "quantity": 2, "item_total": 20.0},
+                {"product_name": "Gadget", "unit_price": 5.0, "quantity": 1, "item_total": 5.0}
+            ],
+            "total_amount": 25.0,
+            "payment_method": "card",
+            "status": "completed"
+        },
+        {
+            "order_id": "456",
+            "order_date": "2024-01-02",
+            "customer": {
+                "customer_id": "C1",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St"
+            },
+            "items": [
+                {"product_name": "Widget", "unit_price": 10.0, "quantity": 1, "item_total": 10.0}
+            ],
+            "total_amount": 10.0,
+            "payment_method": "card",
+            "status": "pending"
+        }
+    ]
+    """
+
+    result = transform_data(raw_json, product_dimension=True)
+
+    assert result["products"].splitlines() == [
+        "product_id,product_name,unit_price",
+        "1,Widget,10.0",
+        "2,Gadget,5.0",
+    ]
+    assert result["items"].splitlines() == [
+        "order_id,product_id,quantity,item_total",
+        "123,1,2,20.0",
+        "123,2,1,5.0",
+        "456,1,1,10.0",
+    ]
+
+
+
+@pytest.mark.parametrize("field", ["product_name", "unit_price"])
+@pytest.mark.parametrize("value", [["Widget"], {"amount": 10.0}])
+def test_transform_product_dimension_rejects_non_scalar_product_fields(field, value):
+    item = {"product_name": "Widget", "unit_price": 10.0, "quantity": 1, "item_total": 10.0}
+    item[field] = value
+    order = {
+        "order_id": "123",
+        "order_date": "2024-01-01",
+        "customer": {
+            "customer_id": "C1",
+            "name": "John Doe",
+            "email": "john@example.com",
+            "address": "123 Main St",
+        },
+        "items": [item],
+        "total_amount": 10.0,
+        "payment_method": "card",
+        "status": "completed",
+    }
+
+    with pytest.raises(SchemaValidationError):
+        transform_data(json.dumps([order]), product_dimension=True)
+
+
+def test_transform_with_stats_manifest():
+    raw_json = """
+    [
+        {
+            "order_id": "123",
+            "order_date": "2024-03-01T10:00:00",
+            "customer": {
+                "customer_id": "C1",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St"
+            },
+            "items": [
+                {"product_name": "Widget", "unit_price": 10.0, "quantity": 2, "item_total": 20.0}
+            ],
+            "total_amount": 20.0,
+            "payment_method": "card",
+            "status": "shipped"
+        },
+        {
+            "order_id": "456",
+            "order_date": "2024-01-15T08:30:00",
+            "customer": {
+                "customer_id": "C2",
+                "name": "Jane Roe",
+                "email": "jane@example.com",
+                "address": "9 Elm St"
+            },
+            "items": [
+                {"product_name": "Widget", "unit_price": 10.0, "quantity": 1, "item_total": 10.0},
+                {"product_name": "Gadget", "unit_price": 5.1, "quantity": 1, "item_total": 5.1}
+            ],
+            "total_amount": 15.1,
+            "payment_method": "paypal",
+            "status": "shipped"
+        }
+    ]
+    """
+
+    tables, manifest = transform_with_stats(raw_json)
+
+    assert set(manifest["tables"]) == set(tables)
+
+    orders = manifest["tables"]["orders"]
+    assert orders["file"] == "orders.csv"
+    assert orders["row_count"] == 2
+    assert orders["order_date_min"] == "2024-01-15T08:30:00"
+    assert orders["order_date_max"] == "2024-03-01T10:00:00"
+    assert orders["total_amount_sum"] == 35.1
+    assert orders["distinct_customers"] == 2
+    assert orders["status_counts"] == {"shipped": 2}
+    assert orders["payment_method_counts"] == {"card": 1, "paypal": 1}
+
+    assert manifest["tables"]["customers"]["row_count"] == 2
+    assert manifest["tables"]["items"]["row_count"] == 3
+    assert manifest["tables"]["items"]["quantity_sum"] == 4
+
+
+def test_transform_stats_tolerate_loosely_typed_fields():
+    raw_json = """
+    [
+        {
+            "order_id": "1",
+            "order_date": null,
+            "customer": {
+                "customer_id": "C1",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St"
+            },
+            "items": [
+                {"product_name": "Widget", "unit_price": 10.0, "quantity": "2", "item_total": 20.0}
+            ],
+            "total_amount": "10.00",
+            "payment_method": null,
+            "status": "shipped"
+        },
+        {
+            "order_id": "2",
+            "order_date": "2024-01-02",
+            "customer": {
+                "customer_id": "C2",
+                "name": "Jane Roe",
+                "email": "jane@example.com",
+                "address": "9 Elm St"
+            },
+            "items": [],
+            "total_amount": "n/a",
+            "payment_method": "card",
+            "status": "pending"
+        }
+    ]
+    """
+
+    tables, manifest = transform_with_stats(raw_json)
+
+    orders = manifest["tables"]["orders"]
+    assert orders["row_count"] == 2
+    assert orders["order_date_min"] == orders["order_date_max"] == "2024-01-02"
+    assert orders["total_amount_sum"] == 10.0
+    assert orders["payment_method_counts"] == {"null": 1, "card": 1}
+    assert manifest["tables"]["items"]["quantity_sum"] == 2
+
+
+def test_transform_json_lines_matches_json_array():
+    orders = [
+        {
+            "order_id": str(i),
+            "order_date": "2024-01-01",
+            "customer": {
+                "customer_id": f"C{i % 2}",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St",
+            },
+            "items": [
+                {
+                    "product_name": "Widget",
+                    "unit_price": 10.0,
+                    "quantity": 1,
+                    "item_total": 10.0,
+                }
+            ],
+            "total_amount": 10.0,
+            "payment_method": "card",
+            "status": "shipped",
+        }
+        for i in range(3)
+    ]
+    json_lines = "\n".join(json.dumps(order) for order in orders) + "\n"
+
+    assert transform_with_stats(json_lines) == transform_with_stats(json.dumps(orders))
+
+
+def test_order_stats_merge_matches_single_pass():
+    orders = [
+        {
+            "order_id": str(i),
+            "order_date": f"2024-01-{i + 1:02d}",
+            "customer": {
+                "customer_id": "C1",
+                "name": "John Doe",
+                "email": "john@example.com",
+                "address": "123 Main St",
+            },
+            "items": [
+                {"product_name": "Widget", "unit_price": 10.0, "quantity": i, "item_total": 10.0 * i}
+            ],
+            "total_amount": 10.0 * i,
+            "payment_method": ["card", "paypal"][i % 2],
+            "status": ["completed", "pending", "shipped"][i % 3],
+        }
+        for i in range(6)
+    ]
+    _, expected = transform_records(orders)
+
+    stats = OrderStats()
+    for part in (orders[:2], orders[2:5], orders[5:]):
+        stats.merge(transform_records(part)[1])
+
+    assert stats.manifest(customer_count=1) == expected